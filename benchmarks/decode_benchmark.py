@@ -0,0 +1,94 @@
+"""
+Compara el decodificador original con los modos rápidos de ImageProcessor
+
+    python benchmarks/decode_benchmark.py [--images 20] [--size 4032 3024] [--model modelo.nnmodel]
+
+Genera fotos JPEG sintéticas (gradientes + ruido, tamaño de un celular de
+12 MP) en un directorio temporal y mide, para cada configuración, imágenes
+por segundo y la diferencia de píxeles contra el camino original (pil +
+LANCZOS). Con --model también compara la probabilidad que da la red; en
+ese caso cada configuración parte del preprocesamiento guardado en el modelo
+(solo cambian decodificador y filtro) y --target se ignora.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neuralNetwork.NeuralNetwork import NeuralNetwork
+from neuralNetwork.Predictor import Predictor
+from neuralNetwork.utilities.ImageProcessor import ImageProcessor
+
+CONFIGS = [
+    ("pil + LANCZOS (original)", {"decoder": "pil", "resample": "LANCZOS"}),
+    ("pil + BILINEAR", {"decoder": "pil", "resample": "BILINEAR"}),
+    ("draft + LANCZOS", {"decoder": "draft", "resample": "LANCZOS"}),
+    ("draft + BILINEAR", {"decoder": "draft", "resample": "BILINEAR"}),
+    ("cv2 + AREA", {"decoder": "cv2", "resample": "BOX"}),
+    ("cv2 + LANCZOS", {"decoder": "cv2", "resample": "LANCZOS"}),
+]
+
+def make_images(directory, count, size, seed=0):
+    """Fotos sintéticas con estructura suave (se comprimen como fotos reales)"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    paths = []
+    for i in range(count):
+        fx, fy, phase = rng.uniform(2, 12, size=3)
+        base = 127 + 80 * np.sin(x / width * fx + phase) * np.cos(y / height * fy)
+        channels = [base + rng.normal(0, 12, size=base.shape) + shift for shift in rng.uniform(-30, 30, size=3)]
+        pixels = np.clip(np.stack(channels, axis=-1), 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f"foto_{i}.jpg")
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de decodificación de imágenes")
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--size", type=int, nargs=2, default=[4032, 3024], metavar=("ANCHO", "ALTO"))
+    parser.add_argument("--target", type=int, nargs=2, default=[700, 600], metavar=("ANCHO", "ALTO"))
+    parser.add_argument("--model", default=None, help="Modelo para medir el cambio en la predicción")
+    args = parser.parse_args()
+
+    network = NeuralNetwork.load(args.model, mmap_mode="r") if args.model else None
+    base_params = {"target_size": args.target}
+    if network is not None:
+        # la misma entrada con la que se entreno el modelo (los modelos sin
+        # preprocesamiento guardado usan el ImageProcessor por defecto)
+        base_params = dict(network.preprocessing or ImageProcessor().get_params())
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generando {args.images} imágenes de {args.size[0]}x{args.size[1]}...")
+        paths = make_images(directory, args.images, args.size)
+
+        reference = None
+        reference_probabilities = None
+        print(f"{'configuración':28s} {'img/s':>8s} {'acelera':>8s} {'dif. media':>11s} {'PSNR dB':>8s} {'dif. prob':>10s}")
+        for name, params in CONFIGS:
+            processor = ImageProcessor.from_params({**base_params, **params})
+            start = time.perf_counter()
+            outputs = np.stack([processor.decode(path) for path in paths])
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference, reference_elapsed = outputs, elapsed
+            diff = np.abs(outputs.astype(np.float32) - reference.astype(np.float32))
+            mse = float(np.mean(diff ** 2))
+            psnr = float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+            probability_diff = ""
+            if network is not None:
+                # Predictor aplica la proyeccion de entrada del modelo, si tiene
+                predictor = Predictor(network=network, processor=processor, batch_size=len(paths))
+                probabilities = predictor.predict_batch(outputs.reshape(len(paths), -1))
+                if reference_probabilities is None:
+                    reference_probabilities = probabilities
+                probability_diff = f"{np.mean(np.abs(probabilities - reference_probabilities)):.4f}"
+            print(f"{name:28s} {len(paths) / elapsed:8.2f} {reference_elapsed / elapsed:7.1f}x "
+                  f"{diff.mean():11.2f} {psnr:8.1f} {probability_diff:>10s}")
+
+if __name__ == "__main__":
+    main()
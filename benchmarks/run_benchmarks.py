@@ -0,0 +1,228 @@
+"""
+Benchmarks reproducibles de preprocesamiento, entrenamiento e inferencia
+
+    python benchmarks/run_benchmarks.py run --output resultados.json [--quick] [--only forward]
+    python benchmarks/run_benchmarks.py run --output nuevo.json --baseline base.json
+    python benchmarks/run_benchmarks.py compare base.json nuevo.json [--threshold 0.15]
+
+Las imágenes se generan localmente (ver decode_benchmark.make_images) con
+una semilla fija, así dos corridas miden exactamente el mismo trabajo. Cada
+benchmark se repite varias veces después de un calentamiento y se guardan
+mínimo, mediana, media y p95 en segundos. compare marca como regresión
+todo benchmark cuya mediana crezca más que el umbral y termina con código
+1, para usarlo entre commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from decode_benchmark import make_images
+from neuralNetwork.NeuralNetwork import NeuralNetwork
+from neuralNetwork.Predictor import Predictor
+from neuralNetwork.utilities.ImageProcessor import ImageProcessor
+
+def measure(function, repeats, warmup=1):
+    """Tiempos de function() en segundos: min, median, mean, p95"""
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    times = np.array(times)
+    return {
+        "min": float(times.min()),
+        "median": float(np.median(times)),
+        "mean": float(times.mean()),
+        "p95": float(np.percentile(times, 95)),
+        "repeats": repeats,
+    }
+
+def quiet(function, *args, **kwargs):
+    """Llama a function sin sus mensajes de progreso en la salida estandar"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+def preprocessing_benchmarks(args, directory, paths):
+    processor = ImageProcessor(target_size=args.target)
+    images = [Image.open(path) for path in paths]
+    for image in images:
+        image.load()
+    resized = [processor.resize_black_and_white(image) for image in images]
+
+    yield ("preprocess/resize_black_and_white", len(images),
+           lambda: [processor.resize_black_and_white(image) for image in images], args.repeats)
+    yield ("preprocess/image_to_vector", len(resized),
+           lambda: [processor.image_to_vector(image) for image in resized], args.repeats)
+    yield ("preprocess/decode", len(paths),
+           lambda: [processor.decode(path) for path in paths], args.repeats)
+    for workers in sorted({1, args.workers}):
+        yield (f"preprocess/batch_processing/workers={workers}", len(paths),
+               lambda: quiet(processor.batch_processing, directory, workers=workers), args.repeats)
+
+def network_benchmarks(args):
+    # las funciones que se entregan se miden en orden: forward, backProp y
+    # gradient_descent de un lote comparten los buffers de la red
+    input_size = args.target[0] * args.target[1]
+    rng = np.random.default_rng(0)
+    for dtype in args.dtypes:
+        network = NeuralNetwork(input_size, args.hidden, dtype=dtype, seed=0)
+        for batch_size in args.batch_sizes:
+            x = rng.integers(0, 256, size=(batch_size, input_size), dtype=np.uint8)
+            y = rng.integers(0, 2, size=(batch_size, 1)).astype(dtype)
+            prefix = f"network/{dtype}/batch={batch_size}"
+            network.reserve(batch_size, uint8_inputs=True)
+            yield f"{prefix}/forward", batch_size, lambda: network.forward(x), args.repeats
+            # backProp usa las activaciones del ultimo forward de este lote
+            error = network.forward(x) - y
+            yield f"{prefix}/backProp", batch_size, lambda: network.backProp(error), args.repeats
+            yield f"{prefix}/gradient_descent", batch_size, lambda: network.gradient_descent(1e-6), args.repeats
+
+            def train_step():
+                output = network.forward(x, training=True)
+                network.backProp(output - y)
+                network.gradient_descent(1e-6)
+            yield f"{prefix}/train_step", batch_size, train_step, args.repeats
+
+def latency_benchmarks(args, directory, paths):
+    input_size = args.target[0] * args.target[1]
+    network = NeuralNetwork(input_size, args.hidden, seed=0)
+    model_path = os.path.join(directory, "benchmark.nnmodel")
+    network.save(model_path, preprocessing=ImageProcessor(target_size=args.target).get_params())
+    predictor = Predictor(model_path)
+    images = iter(paths * (args.repeats * 2 + 2))
+    # una imagen distinta por repeticion, desde la ruta (decodificar + red)
+    yield "end_to_end/predict_one", 1, lambda: predictor.predict_one(next(images)), args.repeats * 2
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        image_dir = os.path.join(directory, "imagenes")
+        os.makedirs(image_dir)
+        print(f"Generando {args.images} imágenes de {args.size[0]}x{args.size[1]}...", file=sys.stderr)
+        paths = make_images(image_dir, args.images, args.size, seed=args.seed)
+        groups = [
+            preprocessing_benchmarks(args, image_dir, paths),
+            network_benchmarks(args),
+            latency_benchmarks(args, directory, paths),
+        ]
+        for group in groups:
+            for name, items, function, repeats in group:
+                if args.only and not any(pattern in name for pattern in args.only):
+                    continue
+                timing = measure(function, repeats)
+                timing["items"] = items
+                timing["per_item"] = timing["median"] / max(items, 1)
+                results[name] = timing
+                print(f"{name:55s} mediana {timing['median'] * 1000:10.3f} ms"
+                      f"  ({timing['per_item'] * 1000:.3f} ms por elemento)", file=sys.stderr)
+    report = {"meta": metadata(args), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados en {args.output}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return compare_reports(baseline, report, args.threshold)
+    return 0
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "images": args.images, "size": args.size, "target": args.target, "hidden": args.hidden,
+            "batch_sizes": args.batch_sizes, "dtypes": args.dtypes, "repeats": args.repeats,
+            "workers": args.workers, "seed": args.seed,
+        },
+    }
+
+def compare_reports(baseline, current, threshold):
+    """
+    Compara medianas benchmark por benchmark
+
+    Returns:
+        1 si algun benchmark empeoro mas que threshold, 0 si no
+    """
+    if baseline["meta"].get("params") != current["meta"].get("params"):
+        print("Aviso: los parámetros de las corridas no coinciden", file=sys.stderr)
+    regressions = 0
+    print(f"{'benchmark':55s} {'base ms':>10s} {'nuevo ms':>10s} {'cambio':>8s}")
+    for name, timing in current["results"].items():
+        if name not in baseline["results"]:
+            print(f"{name:55s} {'-':>10s} {timing['median'] * 1000:10.3f} {'nuevo':>8s}")
+            continue
+        before = baseline["results"][name]["median"]
+        change = timing["median"] / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESIÓN"
+            regressions += 1
+        print(f"{name:55s} {before * 1000:10.3f} {timing['median'] * 1000:10.3f} {change:+8.1%}{flag}")
+    print(f"{regressions} regresiones con umbral de {threshold:.0%}")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de preprocesamiento, entrenamiento e inferencia")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_run = subparsers.add_parser("run", help="Ejecuta los benchmarks")
+    parser_run.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    parser_run.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+    parser_run.add_argument("--threshold", type=float, default=0.15, help="Aumento de la mediana tolerado (0.15 = 15%%)")
+    parser_run.add_argument("--quick", action="store_true", help="Menos imágenes, lotes y repeticiones")
+    parser_run.add_argument("--only", nargs="+", default=None, help="Solo benchmarks cuyo nombre contenga alguno de estos textos")
+    parser_run.add_argument("--images", type=int, default=None)
+    parser_run.add_argument("--size", type=int, nargs=2, default=[1600, 1200], metavar=("ANCHO", "ALTO"))
+    parser_run.add_argument("--target", type=int, nargs=2, default=[700, 600], metavar=("ANCHO", "ALTO"))
+    parser_run.add_argument("--hidden", type=int, default=64)
+    parser_run.add_argument("--batch-sizes", type=int, nargs="+", default=None)
+    parser_run.add_argument("--dtypes", nargs="+", default=["float32", "float64"])
+    parser_run.add_argument("--repeats", type=int, default=None)
+    parser_run.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser_run.add_argument("--seed", type=int, default=0)
+
+    parser_compare = subparsers.add_parser("compare", help="Compara dos archivos de resultados")
+    parser_compare.add_argument("baseline")
+    parser_compare.add_argument("current")
+    parser_compare.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return compare_reports(baseline, current, args.threshold)
+
+    if args.images is None:
+        args.images = 4 if args.quick else 16
+    if args.batch_sizes is None:
+        args.batch_sizes = [1, 16] if args.quick else [1, 16, 64]
+    if args.repeats is None:
+        args.repeats = 3 if args.quick else 10
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
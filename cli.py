@@ -0,0 +1,244 @@
+"""
+Herramienta de línea de comandos (sin interfaz gráfica)
+
+    python cli.py preprocess ORIGEN ALMACEN [--workers N]
+    python cli.py train ALMACEN MODELO [--epochs 100 --batch-size 32 ...]
+    python cli.py score MODELO ENTRADA... [--workers N] [--output resultados.jsonl]
+    python cli.py --profile [--trace-memory] COMANDO ...
+
+ENTRADA puede ser un archivo, una carpeta (se revisa completa) o @lista.txt
+con una ruta por línea.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import numpy as np
+from neuralNetwork.NeuralNetwork import INITIALIZATIONS, LOSSES, NeuralNetwork
+from neuralNetwork.ParallelTrainer import ParallelTrainer
+from neuralNetwork.Predictor import Predictor
+from neuralNetwork.utilities.FeatureStore import FeatureStore
+from neuralNetwork.utilities.Optimizers import get_optimizer
+from neuralNetwork.utilities.ImageProcessor import DECODERS, RESIZE_STRATEGIES, ImageProcessor, find_images
+from neuralNetwork.utilities.Profiler import Profiler
+from neuralNetwork.utilities.Projection import PROJECTIONS, get_projection
+
+def make_labeler(positive):
+    """Etiqueta 1 si el nombre del archivo contiene la cadena positive"""
+    def labeler(file_name):
+        return 1 if positive in file_name else 0
+    return labeler
+
+def instrument(args, *components):
+    """Registra los componentes en el perfilador si se uso --profile"""
+    if args.profiler is not None:
+        for component in components:
+            args.profiler.attach(component)
+
+def preprocess(args):
+    size = args.size
+    if size is None:
+        size = [64, 64] if args.face_crop else [700, 600]
+    processor = ImageProcessor(
+        target_size=tuple(size), resample=args.resample, grayscale=not args.rgb,
+        decoder=args.decoder, strategy=args.strategy, face_crop=args.face_crop,
+        face_cache_dir=args.face_cache or (os.path.join(args.store, "faces") if args.face_crop else None)
+    )
+    instrument(args, processor)
+    labeler = make_labeler(args.positive)
+    if args.rebuild:
+        store = processor.build_feature_store(args.source, args.store, labeler, args.workers)
+    else:
+        store = processor.update_feature_store(args.source, args.store, labeler, args.workers)
+    print(f"Almacen con {len(store)} imagenes en {args.store}")
+
+def train(args):
+    store = FeatureStore(args.store)
+    rng = np.random.default_rng(args.seed)
+    indices = rng.permutation(len(store))
+    test_count = int(round(len(indices) * args.test_size))
+    test_idx, train_idx = np.sort(indices[:test_count]), indices[test_count:]
+    val_idx = None
+    val_count = int(round(len(train_idx) * args.val_size))
+    if val_count > 0:
+        val_idx, train_idx = np.sort(train_idx[:val_count]), train_idx[val_count:]
+
+    features = store.features
+    projection = get_projection(args.projection, args.components, seed=args.seed)
+    if projection is not None:
+        instrument(args, projection)
+        print(f"Ajustando proyeccion {args.projection} de {store.feature_size} entradas a {args.components}...")
+        # se ajusta solo con las filas de entrenamiento
+        projection.fit(store.features, indices=train_idx)
+        # la red entrena sobre la matriz proyectada, que cabe en memoria
+        features = projection.transform_features(store.features)
+    validation = None
+    if val_idx is not None:
+        # se evalua por bloques sobre el memmap, sin copiar la validacion a memoria
+        validation = (features, store.labels, val_idx)
+
+    network = NeuralNetwork(
+        input_size=features.shape[1], hidden_size=args.hidden, output_size=1, dtype=args.dtype,
+        activations=args.activation, loss=args.loss, layers=args.layers, init=args.init,
+        dropout=args.dropout, seed=args.seed, projection=projection
+    )
+    print(network.summary(args.batch_size))
+    instrument(args, network)
+    optimizer = get_optimizer(args.optimizer, args.lr, weight_decay=args.weight_decay)
+    if projection is not None:
+        if args.workers > 1:
+            print("Con --projection se entrena en un solo proceso (la matriz proyectada es pequeña)")
+        network.train_minibatch(
+            (features[train_idx], store.labels[train_idx]), args.lr, args.epochs, batch_size=args.batch_size,
+            max_error=args.max_error, seed=int(rng.integers(2**31)), optimizer=optimizer,
+            validation=validation, patience=args.patience
+        )
+    elif args.workers > 1:
+        trainer = ParallelTrainer(network, args.workers, args.threads_per_worker)
+        trainer.train(
+            store, args.lr, args.epochs, batch_size=args.batch_size, indices=train_idx,
+            max_error=args.max_error, seed=int(rng.integers(2**31)), optimizer=optimizer,
+            validation=validation, patience=args.patience
+        )
+    else:
+        train_source = lambda: store.iter_batches(
+            args.batch_size, indices=train_idx, shuffle=True, seed=rng.integers(2**32), dtype=network.dtype
+        )
+        network.train_minibatch(
+            train_source, args.lr, args.epochs, batch_size=args.batch_size, max_error=args.max_error,
+            optimizer=optimizer, validation=validation, patience=args.patience
+        )
+
+    if test_count > 0:
+        metrics = network.evaluate(features, store.labels, threshold=args.threshold, indices=test_idx)
+        print(f"Precisión en test: {metrics['accuracy']:.2%} | Precision: {metrics['precision']:.2%}"
+              f" | Recall: {metrics['recall']:.2%} | AUC: {metrics['auc']:.3f}")
+    network.save(args.model, preprocessing=store.manifest["params"], threshold=args.threshold)
+    print(f"Modelo guardado en {args.model}")
+
+def expand_inputs(inputs):
+    """Convierte archivos, carpetas y listas @archivo en una lista de rutas"""
+    paths = []
+    for item in inputs:
+        if item.startswith("@"):
+            with open(item[1:], encoding="utf-8") as f:
+                paths.extend(line.strip() for line in f if line.strip())
+        elif os.path.isdir(item):
+            paths.extend(find_images(item))
+        else:
+            paths.append(item)
+    return paths
+
+def score(args):
+    predictor = Predictor(args.model, batch_size=args.batch_size)
+    instrument(args, predictor.network, predictor.processor)
+    paths = expand_inputs(args.inputs)
+    output_format = args.format
+    if output_format is None:
+        output_format = "csv" if args.output and args.output.endswith(".csv") else "jsonl"
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = None
+        if output_format == "csv":
+            writer = csv.writer(output)
+            writer.writerow(["path", "probability", "recognized"])
+        count = 0
+        for path, probability in predictor.iter_predict_paths(paths, workers=args.workers):
+            recognized = probability > predictor.threshold
+            if writer is not None:
+                writer.writerow([path, f"{probability:.6f}", int(recognized)])
+            else:
+                output.write(json.dumps({"path": path, "probability": probability, "recognized": recognized}) + "\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"{count} de {len(paths)} imagenes evaluadas", file=sys.stderr)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Reconocimiento facial sin interfaz gráfica")
+    parser.add_argument("--profile", action="store_true",
+                        help="Muestra al final el tiempo por etapa y el perfil de cProfile (solo del proceso principal)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Con --profile, registra tambien las reservas de memoria (tracemalloc)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_preprocess = subparsers.add_parser("preprocess", help="Procesa un directorio a un FeatureStore")
+    parser_preprocess.add_argument("source", help="Directorio con las imagenes originales")
+    parser_preprocess.add_argument("store", help="Directorio del FeatureStore")
+    parser_preprocess.add_argument("--workers", type=int, default=None, help="Procesos (por defecto todos los nucleos)")
+    parser_preprocess.add_argument("--size", type=int, nargs=2, default=None, metavar=("ANCHO", "ALTO"),
+                                   help="Por defecto 700 600 (64 64 con --face-crop)")
+    parser_preprocess.add_argument("--resample", default="LANCZOS", help="Filtro de PIL (LANCZOS, BILINEAR, ...)")
+    parser_preprocess.add_argument("--decoder", choices=DECODERS, default="pil",
+                                   help="draft/cv2 decodifican el JPEG ya reducido (mucho mas rapido)")
+    parser_preprocess.add_argument("--strategy", choices=RESIZE_STRATEGIES, default="direct",
+                                   help="direct estira, pad rellena con negro, crop recorta el centro")
+    parser_preprocess.add_argument("--face-crop", action="store_true",
+                                   help="Recortar y alinear solo el rostro (necesita OpenCV)")
+    parser_preprocess.add_argument("--face-cache", default=None,
+                                   help="Cache de detecciones (por defecto ALMACEN/faces)")
+    parser_preprocess.add_argument("--rgb", action="store_true", help="Conservar color en vez de blanco y negro")
+    parser_preprocess.add_argument("--positive", default="gerardo", help="Texto en el nombre de archivo que indica etiqueta 1")
+    parser_preprocess.add_argument("--rebuild", action="store_true", help="Reprocesar todo en vez de actualizar")
+    parser_preprocess.set_defaults(func=preprocess)
+
+    parser_train = subparsers.add_parser("train", help="Entrena una red con un FeatureStore")
+    parser_train.add_argument("store", help="Directorio del FeatureStore")
+    parser_train.add_argument("model", help="Archivo de salida del modelo")
+    parser_train.add_argument("--hidden", type=int, default=64, help="Neuronas de la primera capa oculta")
+    parser_train.add_argument("--layers", type=int, nargs="+", default=None, metavar="N",
+                              help="Tamaños de todas las capas ocultas (reemplaza --hidden)")
+    parser_train.add_argument("--init", choices=INITIALIZATIONS, default="auto")
+    parser_train.add_argument("--dropout", type=float, default=0.0)
+    parser_train.add_argument("--activation", default="sigmoid",
+                              help="Activacion de las capas ocultas: sigmoid, tanh, relu, leaky_relu[:alpha]")
+    parser_train.add_argument("--loss", choices=LOSSES, default="bce")
+    parser_train.add_argument("--projection", choices=list(PROJECTIONS), default=None,
+                              help="Reduce los pixeles antes de la red: pca (PCA aleatorizado) o random (proyeccion dispersa)")
+    parser_train.add_argument("--components", type=int, default=256, help="Entradas de la red con --projection")
+    parser_train.add_argument("--epochs", type=int, default=100)
+    parser_train.add_argument("--batch-size", type=int, default=32,
+                              help="Tamaño del lote (por proceso si --workers > 1)")
+    parser_train.add_argument("--workers", type=int, default=1,
+                              help="Procesos de entrenamiento con paralelismo de datos")
+    parser_train.add_argument("--threads-per-worker", type=int, default=1,
+                              help="Hilos de BLAS de cada proceso (workers x hilos <= nucleos)")
+    parser_train.add_argument("--lr", type=float, default=0.01)
+    parser_train.add_argument("--optimizer", choices=["sgd", "momentum", "rmsprop", "adam"], default="sgd")
+    parser_train.add_argument("--weight-decay", type=float, default=0.0)
+    parser_train.add_argument("--max-error", type=float, default=0.0)
+    parser_train.add_argument("--val-size", type=float, default=0.0,
+                              help="Fraccion del entrenamiento para validacion y early stopping")
+    parser_train.add_argument("--patience", type=int, default=10, help="Epocas sin mejora en validacion")
+    parser_train.add_argument("--test-size", type=float, default=0.2)
+    parser_train.add_argument("--threshold", type=float, default=0.5)
+    parser_train.add_argument("--dtype", default="float32")
+    parser_train.add_argument("--seed", type=int, default=None)
+    parser_train.set_defaults(func=train)
+
+    parser_score = subparsers.add_parser("score", help="Evalua imagenes con un modelo guardado")
+    parser_score.add_argument("model", help="Archivo del modelo")
+    parser_score.add_argument("inputs", nargs="+", help="Archivos, carpetas o @lista.txt")
+    parser_score.add_argument("--workers", type=int, default=1, help="Procesos para decodificar imagenes")
+    parser_score.add_argument("--batch-size", type=int, default=32)
+    parser_score.add_argument("--output", default=None, help="Archivo de resultados (por defecto la salida estandar)")
+    parser_score.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    parser_score.set_defaults(func=score)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.profiler = None
+    if not args.profile:
+        args.func(args)
+        return
+    with Profiler(cprofile=True, trace_memory=args.trace_memory) as profiler:
+        args.profiler = profiler
+        args.func(args)
+    print(profiler.report(), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
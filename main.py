@@ -1,13 +1,38 @@
+import time
+# referencia del tiempo hasta que se dibuja la ventana (incluye los imports)
+START_TIME = time.perf_counter()
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
+from tkinter import filedialog, messagebox, ttk
+import argparse
+import csv
+import json
 import os
-from neuralNetwork.utilities.ImageProcessor import ImageProcessor
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# numpy, PIL y la red se importan al usarse (ver load_model y display_image):
+# importarlos aqui retrasa la primera pintada de la ventana
+from neuralNetwork.utilities.LRUCache import LRUCache, file_key
+from neuralNetwork.utilities.Profiler import Instrumented, Profiler
 
-class FaceRecognitionApp:
-    def __init__(self):
+# cada cuanto (ms) el hilo de la interfaz revisa la cola de resultados
+POLL_INTERVAL_MS = 50
+# procesos que decodifican imagenes en el modo por lotes (uno queda para la red)
+BATCH_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# memoria para miniaturas, entradas preprocesadas y predicciones ya calculadas
+CACHE_MAX_BYTES = 256 * 2**20
+CACHE_MAX_ENTRIES = 20000
+# tamaño maximo de la vista previa
+DISPLAY_SIZE = (300, 250)
+
+class InferenceCancelled(Exception):
+    pass
+
+class FaceRecognitionApp(Instrumented):
+    # etapas medidas con add_hook: app/first_paint, app/load_model,
+    # app/display_image y app/inference; los ganchos tambien se registran en
+    # la red y el procesador del modelo
+    def __init__(self, model_path=None):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         ctk.set_window_scaling(1.0)
@@ -22,10 +47,40 @@ class FaceRecognitionApp:
         self.root.grid_columnconfigure(0, weight=1)
         self.root.grid_rowconfigure(0, weight=1)
         
-        self.current_image = None
         self.image_path = None
+        # llave (ruta, mtime, tamaño) de la imagen mostrada; None si no hay
+        self.image_key = None
+        self.predictor = None
+        self.model_path = None
+        # llaves del modelo para el cache: (archivo del modelo, preprocesamiento)
+        self.model_keys = None
+        # miniaturas, entradas de la red y probabilidades, por imagen; las
+        # llaves incluyen mtime, asi un archivo modificado se vuelve a procesar
+        self.cache = LRUCache(CACHE_MAX_BYTES, CACHE_MAX_ENTRIES)
+        
+        # la inferencia corre en un hilo aparte y devuelve mensajes por esta cola;
+        # un solo hilo porque la red reutiliza sus buffers de activacion
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results = queue.Queue()
+        self.job_id = 0
+        self.cancel_event = None
+        self.in_flight = False
+        self.loading_model = False
+        self.polling = False
+        self.first_paint_time = None
         
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # el modelo se carga cuando la ventana ya esta dibujada
+        self.root.after_idle(self.on_first_paint, model_path)
+    
+    def on_first_paint(self, model_path=None):
+        self.first_paint_time = time.perf_counter() - START_TIME
+        if self._hooks:
+            self._emit("app/first_paint", START_TIME)
+        if model_path:
+            self.load_model(model_path)
         
     def create_widgets(self):
         self.scrollable_frame = ctk.CTkScrollableFrame(
@@ -64,6 +119,22 @@ class FaceRecognitionApp:
         )
         self.load_button.pack(pady=10)
         
+        self.model_button = ctk.CTkButton(
+            load_section,
+            text="Cargar Modelo",
+            command=self.load_model,
+            width=200,
+            height=40
+        )
+        self.model_button.pack(pady=10)
+        
+        self.model_label = ctk.CTkLabel(
+            load_section,
+            text="Ningún modelo cargado",
+            font=ctk.CTkFont(size=12)
+        )
+        self.model_label.pack(pady=5)
+        
         preview_frame = ctk.CTkFrame(main_frame)
         preview_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
@@ -100,7 +171,17 @@ class FaceRecognitionApp:
             height=50,
             state="disabled"
         )
-        self.process_button.pack(pady=15)
+        self.process_button.pack(pady=(15, 5))
+        
+        self.cancel_button = ctk.CTkButton(
+            process_frame,
+            text="Cancelar",
+            command=self.cancel_processing,
+            width=250,
+            height=30,
+            state="disabled"
+        )
+        self.cancel_button.pack(pady=(5, 15))
         
         result_frame = ctk.CTkFrame(main_frame)
         result_frame.pack(fill="x", padx=20, pady=10)
@@ -133,6 +214,80 @@ class FaceRecognitionApp:
         self.progress_bar.pack(pady=10, padx=20, fill="x")
         self.progress_bar.set(0)
         
+        self.create_batch_widgets(main_frame)
+    
+    def create_batch_widgets(self, main_frame):
+        """Sección para procesar muchas imágenes (varios archivos o una carpeta)"""
+        batch_frame = ctk.CTkFrame(main_frame)
+        batch_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        batch_title = ctk.CTkLabel(
+            batch_frame,
+            text="Procesamiento por Lotes",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        batch_title.pack(pady=10)
+        
+        buttons_frame = ctk.CTkFrame(batch_frame, fg_color="transparent")
+        buttons_frame.pack(pady=5)
+        
+        self.select_files_button = ctk.CTkButton(
+            buttons_frame,
+            text="Seleccionar Varias",
+            command=self.select_batch_files,
+            width=160
+        )
+        self.select_files_button.grid(row=0, column=0, padx=5)
+        
+        self.scan_folder_button = ctk.CTkButton(
+            buttons_frame,
+            text="Escanear Carpeta",
+            command=self.scan_batch_folder,
+            width=160
+        )
+        self.scan_folder_button.grid(row=0, column=1, padx=5)
+        
+        self.export_button = ctk.CTkButton(
+            buttons_frame,
+            text="Exportar CSV",
+            command=self.export_results,
+            width=160,
+            state="disabled"
+        )
+        self.export_button.grid(row=0, column=2, padx=5)
+        
+        self.batch_label = ctk.CTkLabel(
+            batch_frame,
+            text="",
+            font=ctk.CTkFont(size=12)
+        )
+        self.batch_label.pack(pady=5)
+        
+        table_frame = ctk.CTkFrame(batch_frame)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.results_table = ttk.Treeview(
+            table_frame,
+            columns=("archivo", "probabilidad", "resultado"),
+            show="headings",
+            height=10
+        )
+        self.results_table.heading("archivo", text="Archivo")
+        self.results_table.heading("probabilidad", text="Probabilidad")
+        self.results_table.heading("resultado", text="Resultado")
+        self.results_table.column("archivo", width=380)
+        self.results_table.column("probabilidad", width=110, anchor="center")
+        self.results_table.column("resultado", width=130, anchor="center")
+        self.results_table.pack(side="left", fill="both", expand=True)
+        
+        scrollbar = ctk.CTkScrollbar(table_frame, command=self.results_table.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.results_table.configure(yscrollcommand=scrollbar.set)
+        
+        # la vista previa se genera solo al seleccionar una fila
+        self.results_table.bind("<<TreeviewSelect>>", self.on_result_selected)
+        self.batch_results = {}
+        
     def load_image(self):
         """Cargar imagen desde el sistema de archivos"""
         file_types = [
@@ -151,128 +306,439 @@ class FaceRecognitionApp:
             try:
                 self.image_path = file_path
                 self.display_image(file_path)
-                self.process_button.configure(state="normal")
+                if not self.in_flight:
+                    self.process_button.configure(state="normal")
                 self.result_label.configure(text="Imagen cargada. Lista para procesar.")
                 self.confidence_label.configure(text="")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo cargar la imagen: {str(e)}")
     
+    def add_hook(self, hook):
+        super().add_hook(hook)
+        if self.predictor is not None:
+            self.predictor.network.add_hook(hook)
+            self.predictor.processor.add_hook(hook)
+
+    def remove_hook(self, hook):
+        super().remove_hook(hook)
+        if self.predictor is not None:
+            self.predictor.network.remove_hook(hook)
+            self.predictor.processor.remove_hook(hook)
+
+    def load_model(self, model_path=None):
+        """Cargar un modelo entrenado (archivo guardado con NeuralNetwork.save)"""
+        if model_path is None:
+            model_path = filedialog.askopenfilename(
+                title="Seleccionar modelo",
+                filetypes=[("Modelo", "*.nnmodel"), ("Todos los archivos", "*.*")]
+            )
+        if not model_path:
+            return
+        self.loading_model = True
+        self.model_label.configure(text=f"Cargando modelo: {os.path.basename(model_path)}...")
+        self.executor.submit(self.model_job, model_path)
+        self.schedule_poll()
+    
+    def model_job(self, model_path):
+        """Se ejecuta en el hilo de inferencia: importa la red y abre el modelo"""
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        try:
+            from neuralNetwork.Predictor import Predictor
+            # los pesos se mapean en memoria: no se leen completos al cargar
+            predictor = Predictor(model_path)
+            model_keys = (file_key(model_path), json.dumps(predictor.processor.get_params(), sort_keys=True))
+            if hooks:
+                self._emit("app/load_model", start)
+            self.results.put((None, "model", (model_path, predictor, model_keys)))
+        except Exception as e:
+            self.results.put((None, "model_error", str(e)))
+    
+    def set_predictor(self, model_path, predictor, model_keys):
+        self.predictor = predictor
+        self.model_path = model_path
+        self.model_keys = model_keys
+        for hook in self._hooks:
+            predictor.network.add_hook(hook)
+            predictor.processor.add_hook(hook)
+        self.model_label.configure(text=f"Modelo: {os.path.basename(model_path)}")
+    
+    def make_thumbnail(self, image_path):
+        """
+        Returns:
+            (miniatura PIL, ancho, alto, tamaño del archivo en KB)
+        """
+        from PIL import Image
+        with Image.open(image_path) as pil_image:
+            width, height = pil_image.size
+            # thumbnail usa draft: un JPEG se decodifica ya reducido
+            pil_image.thumbnail(DISPLAY_SIZE, Image.Resampling.LANCZOS)
+            thumbnail = pil_image.copy()
+        file_size = os.path.getsize(image_path) / 1024  # KB
+        return thumbnail, width, height, file_size
+    
     def display_image(self, image_path):
         """Permite mostrar una vista previa de la imagen"""
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
         try:
-            pil_image = Image.open(image_path)
-            self.current_image = pil_image.copy()
-            
-            width, height = pil_image.size
-            file_size = os.path.getsize(image_path) / 1024  # KB
+            image_key = file_key(image_path)
+            # la imagen completa no se conserva: la red la vuelve a leer del
+            # archivo (o usa la entrada ya preprocesada del cache)
+            thumbnail, width, height, file_size = self.cache.get_or_compute(
+                ("thumbnail", image_key), lambda: self.make_thumbnail(image_path)
+            )
+            self.image_key = image_key
             
             self.info_label.configure(
                 text=f"Dimensiones: {width}x{height} | Tamaño: {file_size:.1f} KB"
             )
             
-            # Redimensionar para mostrar (manteniendo aspecto)
-            display_size = (300, 250)
-            pil_image.thumbnail(display_size, Image.Resampling.LANCZOS)
-            
             # Convertir a formato compatible con CustomTkinter
             photo = ctk.CTkImage(
-                light_image=pil_image,
-                dark_image=pil_image,
-                size=pil_image.size
+                light_image=thumbnail,
+                dark_image=thumbnail,
+                size=thumbnail.size
             )
             
             # Actualizar el label con la imagen
             self.image_label.configure(image=photo, text="")
+            if hooks:
+                self._emit("app/display_image", start, thumbnail.width * thumbnail.height * len(thumbnail.getbands()))
             
         except Exception as e:
+            self.image_key = None
             messagebox.showerror("Error", f"Error al mostrar la imagen: {str(e)}")
     
     def process_image(self):
-        """Procesa la imagen con la red neuronal"""
-        if not self.current_image:
+        """Procesa la imagen con la red neuronal en segundo plano"""
+        if self.in_flight:
+            return
+        if self.image_key is None:
             messagebox.showwarning("Advertencia", "Por favor, carga una imagen primero.")
             return
-        
-        try:
-            # Mostrar progreso
-            self.progress_bar.set(0.2)
-            self.result_label.configure(text="Procesando imagen...")
-            self.root.update()
-            
-            # Simular procesamiento de la red neuronal
-            # AQUÍ ES DONDE INTEGRARÍAS TU RED NEURONAL
-            result, confidence = self.neural_network_prediction()
-            
-            self.progress_bar.set(0.8)
-            self.root.update()
-            
-            # Mostrar resultado
-            if result:
-                self.result_label.configure(
-                    text="✅ ¡ROSTRO RECONOCIDO!",
-                    text_color="green"
-                )
+        if self.predictor is None:
+            if self.loading_model:
+                messagebox.showinfo("Información", "El modelo todavía se está cargando.")
             else:
-                self.result_label.configure(
-                    text="❌ Rostro no reconocido",
-                    text_color="red"
-                )
-            
-            self.confidence_label.configure(
-                text=f"Nivel de confianza: {confidence:.1f}%"
-            )
-            
-            self.progress_bar.set(1.0)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al procesar la imagen: {str(e)}")
-            self.progress_bar.set(0)
-    
-    def neural_network_prediction(self):
-        """
-        MÉTODO PARA INTEGRAR TU RED NEURONAL
+                messagebox.showwarning("Advertencia", "Por favor, carga un modelo primero.")
+            return
         
-        Aquí debes reemplazar este código con tu red neuronal real.
-        Este es solo un ejemplo que simula el comportamiento.
-        """
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        self.set_in_flight(True)
+        self.progress_bar.set(0)
+        self.result_label.configure(text="Procesando imagen...", text_color=ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        self.confidence_label.configure(text="")
         
-        # Preprocesar imagen para tu red neuronal
-        # Ejemplo de preprocesamiento básico:
-        image_array = np.array(self.current_image)
+        self.executor.submit(
+            self.inference_job, self.job_id, self.predictor, self.model_keys,
+            self.image_path, self.image_key, self.cancel_event
+        )
+        self.schedule_poll()
+    
+    def set_in_flight(self, in_flight):
+        self.in_flight = in_flight
+        state = "disabled" if in_flight else "normal"
+        if self.image_key is not None:
+            self.process_button.configure(state=state)
+        self.select_files_button.configure(state=state)
+        self.scan_folder_button.configure(state=state)
+        self.cancel_button.configure(state="normal" if in_flight else "disabled")
+    
+    def select_batch_files(self):
+        """Seleccionar varias imágenes para procesarlas en lote"""
+        paths = filedialog.askopenfilenames(
+            title="Seleccionar imágenes",
+            filetypes=[("Imágenes", "*.jpg *.jpeg *.png *.bmp *.tiff"), ("Todos los archivos", "*.*")]
+        )
+        if paths:
+            self.start_batch(list(paths))
+    
+    def scan_batch_folder(self):
+        """Procesar todas las imágenes de una carpeta (incluye subcarpetas)"""
+        directory = filedialog.askdirectory(title="Seleccionar carpeta")
+        if directory:
+            from neuralNetwork.utilities.ImageProcessor import find_images
+            paths = find_images(directory)
+            if not paths:
+                messagebox.showinfo("Información", "No se encontraron imágenes en la carpeta.")
+                return
+            self.start_batch(paths)
+    
+    def start_batch(self, paths):
+        if self.in_flight:
+            return
+        if self.predictor is None:
+            if self.loading_model:
+                messagebox.showinfo("Información", "El modelo todavía se está cargando.")
+            else:
+                messagebox.showwarning("Advertencia", "Por favor, carga un modelo primero.")
+            return
         
-        # Convertir a RGB si es necesario
-        if len(image_array.shape) == 3 and image_array.shape[2] == 4:
-            image_array = cv2.cvtColor(image_array, cv2.COLOR_RGBA2RGB)
-        elif len(image_array.shape) == 3:
-            image_array = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
+        self.results_table.delete(*self.results_table.get_children())
+        self.batch_results = {}
+        self.export_button.configure(state="disabled")
+        self.batch_label.configure(text=f"0 de {len(paths)} imágenes procesadas")
         
-        # Redimensionar a las dimensiones que espera tu red (ejemplo: 224x224)
-        # processed_image = cv2.resize(image_array, (224, 224))
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        self.set_in_flight(True)
+        self.progress_bar.set(0)
         
-        # Normalizar
-        # processed_image = processed_image / 255.0
+        self.executor.submit(
+            self.batch_job, self.job_id, self.predictor, self.model_keys, paths, self.cancel_event
+        )
+        self.schedule_poll()
+    
+    def batch_job(self, job_id, predictor, model_keys, paths, cancel_event):
+        """
+        Se ejecuta en el hilo de inferencia. Mientras la red procesa un lote,
+        el pool de procesos ya está decodificando las imágenes siguientes.
+        """
+        total = len(paths)
+        done = 0
+        try:
+            # la cancelacion se revisa entre imagenes decodificadas, no solo al
+            # terminar cada lote, y las decodificaciones en cola se descartan
+            for path, probability in predictor.iter_predict_paths(
+                    paths, workers=BATCH_WORKERS, cancel_event=cancel_event):
+                if cancel_event.is_set():
+                    return
+                try:
+                    # al seleccionar la imagen despues no se vuelve a evaluar
+                    self.cache.put(("prediction", file_key(path), model_keys[0]), probability)
+                except OSError:
+                    pass
+                done += 1
+                self.results.put((job_id, "batch_item", (path, probability, done, total)))
+            if cancel_event.is_set():
+                return
+            self.results.put((job_id, "batch_done", (done, total)))
+        except Exception as e:
+            self.results.put((job_id, "error", str(e)))
+    
+    def add_batch_result(self, path, probability, done, total):
+        is_recognized = probability > self.predictor.threshold
+        self.batch_results[path] = (probability, is_recognized)
+        self.results_table.insert(
+            "", "end", iid=path,
+            values=(path, f"{probability:.2%}", "Reconocido" if is_recognized else "No reconocido")
+        )
+        self.progress_bar.set(done / total)
+        self.batch_label.configure(text=f"{done} de {total} imágenes procesadas")
+    
+    def on_result_selected(self, event=None):
+        selection = self.results_table.selection()
+        if not selection:
+            return
+        path = selection[0]
+        self.image_path = path
+        self.display_image(path)
+        probability, is_recognized = self.batch_results[path]
+        confidence = (probability if is_recognized else 1 - probability) * 100
+        self.show_result(is_recognized, confidence)
+    
+    def export_results(self):
+        """Guardar los resultados del lote en un archivo CSV"""
+        file_path = filedialog.asksaveasfilename(
+            title="Exportar resultados",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv")]
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["archivo", "probabilidad", "reconocido"])
+                for path, (probability, is_recognized) in self.batch_results.items():
+                    writer.writerow([path, f"{probability:.6f}", int(is_recognized)])
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo exportar: {str(e)}")
+    
+    def cancel_processing(self):
+        """Cancela la inferencia en curso (se detiene en la siguiente etapa)"""
+        if self.in_flight:
+            self.cancel_event.set()
+            self.job_id += 1
+            self.set_in_flight(False)
+            self.progress_bar.set(0)
+            self.export_button.configure(state="normal" if self.batch_results else "disabled")
+            self.result_label.configure(text="Procesamiento cancelado.", text_color=ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+    
+    def inference_job(self, job_id, predictor, model_keys, image_path, image_key, cancel_event):
+        """Se ejecuta en el hilo de inferencia; nunca toca widgets"""
+        def report(fraction, text):
+            if cancel_event.is_set():
+                raise InferenceCancelled()
+            self.results.put((job_id, "progress", (fraction, text)))
+        
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        try:
+            result = self.neural_network_prediction(predictor, model_keys, image_path, image_key, report)
+            if hooks:
+                self._emit("app/inference", start)
+            self.results.put((job_id, "result", result))
+        except InferenceCancelled:
+            pass
+        except Exception as e:
+            self.results.put((job_id, "error", str(e)))
+    
+    def schedule_poll(self):
+        """Programa poll_results si no hay ya una revision pendiente"""
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_INTERVAL_MS, self.poll_results)
+    
+    def poll_results(self):
+        """Vacía la cola de resultados desde el hilo de la interfaz"""
+        self.polling = False
+        while True:
+            try:
+                job_id, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "model":
+                self.loading_model = False
+                self.set_predictor(*payload)
+                continue
+            if kind == "model_error":
+                self.loading_model = False
+                self.model_label.configure(
+                    text=f"Modelo: {os.path.basename(self.model_path)}" if self.model_path else "Ningún modelo cargado"
+                )
+                messagebox.showerror("Error", f"No se pudo cargar el modelo: {payload}")
+                continue
+            if job_id != self.job_id:
+                # resultado de un trabajo cancelado
+                continue
+            if kind == "progress":
+                fraction, text = payload
+                self.progress_bar.set(fraction)
+                self.result_label.configure(text=text)
+            elif kind == "result":
+                self.set_in_flight(False)
+                self.show_result(*payload)
+            elif kind == "batch_item":
+                self.add_batch_result(*payload)
+            elif kind == "batch_done":
+                done, total = payload
+                self.set_in_flight(False)
+                self.progress_bar.set(1.0)
+                self.batch_label.configure(
+                    text=f"{done} de {total} imágenes procesadas"
+                    + (f" ({total - done} no se pudieron leer)" if done < total else "")
+                )
+                self.export_button.configure(state="normal" if self.batch_results else "disabled")
+            elif kind == "error":
+                self.set_in_flight(False)
+                self.progress_bar.set(0)
+                messagebox.showerror("Error", f"Error al procesar la imagen: {payload}")
+        if self.in_flight or self.loading_model:
+            self.schedule_poll()
+    
+    def show_result(self, result, confidence):
+        if result:
+            self.result_label.configure(
+                text="✅ ¡ROSTRO RECONOCIDO!",
+                text_color="green"
+            )
+        else:
+            self.result_label.configure(
+                text="❌ Rostro no reconocido",
+                text_color="red"
+            )
         
-        # AQUÍ LLAMAS A TU RED NEURONAL:
-        # prediction = tu_modelo.predict(processed_image)
-        # confidence = float(prediction[0]) * 100
-        # is_recognized = prediction[0] > 0.5  # umbral de decisión
+        self.confidence_label.configure(
+            text=f"Nivel de confianza: {confidence:.1f}%"
+        )
         
-        # SIMULACIÓN (reemplazar con tu código real):
-        import random
-        confidence = random.uniform(60, 95)
-        is_recognized = confidence > 75
+        self.progress_bar.set(1.0)
+    
+    def neural_network_prediction(self, predictor, model_keys, image_path, image_key, report):
+        """
+        Ejecuta la red neuronal sobre una imagen (en el hilo de inferencia)
+        
+        La entrada preprocesada y la probabilidad quedan en self.cache: volver
+        a evaluar la misma imagen (sin modificar) con el mismo modelo es
+        inmediato, y con otro modelo del mismo preprocesamiento solo se
+        ejecuta la red.
+        
+        Args:
+            predictor: Predictor con el modelo cargado
+            model_keys: (llave del archivo del modelo, preprocesamiento en JSON)
+            image_path: Ruta de la imagen
+            image_key: file_key de la imagen al mostrarla
+            report: Funcion report(fraccion, texto) llamada al iniciar cada etapa;
+                lanza InferenceCancelled si se pidió cancelar
+        
+        Returns:
+            (is_recognized, confidence): confidence es la probabilidad (en %)
+            de la decision tomada
+        """
+        model_key, preprocessing_key = model_keys
+        prediction_key = ("prediction", image_key, model_key)
+        probability = self.cache.get(prediction_key)
+        if probability is None:
+            # mismo preprocesamiento que en el entrenamiento (parametros guardados en el modelo)
+            report(0.1, "Preprocesando imagen...")
+            pixel_vector = self.cache.get_or_compute(
+                ("input", image_key, preprocessing_key), lambda: predictor.image_to_input(image_path)
+            )
+            
+            report(0.6, "Ejecutando red neuronal...")
+            probability = float(predictor.predict_batch(pixel_vector.reshape(1, -1))[0])
+            self.cache.put(prediction_key, probability)
+        is_recognized = probability > predictor.threshold
+        confidence = (probability if is_recognized else 1 - probability) * 100
         
+        report(0.9, "Finalizando...")
         return is_recognized, confidence
     
+    def on_close(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
     def run(self):
         """Ejecutar la aplicación"""
         self.root.mainloop()
 
 # Función principal
 def main():
-    app = FaceRecognitionApp()
-    app.run()
+    parser = argparse.ArgumentParser(description="Reconocimiento facial con la red neuronal")
+    parser.add_argument("model", nargs="?", default=None, help="Modelo .nnmodel a cargar al iniciar")
+    parser.add_argument("--profile", action="store_true",
+                        help="Al cerrar muestra el tiempo por etapa y el perfil de cProfile del hilo de la interfaz")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Con --profile, registra tambien las reservas de memoria (tracemalloc)")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="Muestra el tiempo hasta que se dibuja la ventana y la cierra")
+    args = parser.parse_args()
+    app = FaceRecognitionApp(args.model)
+    if args.startup_time:
+        def report_startup():
+            print(f"Primera pintada de la ventana: {app.first_paint_time * 1000:.0f} ms")
+            app.on_close()
+        # se ejecuta despues de on_first_paint
+        app.root.after_idle(report_startup)
+    if not args.profile:
+        app.run()
+        return
+    # cProfile solo ve el hilo de la interfaz; la inferencia queda en las etapas
+    with Profiler(app, cprofile=True, trace_memory=args.trace_memory) as profiler:
+        app.run()
+    print(profiler.report())
+    stats = app.cache.stats()
+    print(f"Cache: {stats['entries']} entradas, {stats['bytes'] / 2**20:.1f} MB, "
+          f"{stats['hits']} aciertos, {stats['misses']} fallos, {stats['evictions']} expulsiones")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,751 @@
+import time
+import numpy as np
+from .utilities.ModelFile import save_model, load_model
+from .utilities.Metrics import binary_report
+from .utilities.Activations import LeakyReLU, ReLU, Sigmoid, get_activation
+from .utilities.Optimizers import get_optimizer
+from .utilities.Profiler import Instrumented
+from .utilities.Projection import projection_from_config
+
+LOSSES = ("bce", "mse")
+INITIALIZATIONS = ("auto", "xavier", "he", "normal")
+# operaciones aproximadas por elemento de cada activacion (para layer_summary)
+ACTIVATION_FLOPS = {"sigmoid": 6, "tanh": 6, "relu": 1, "leaky_relu": 2}
+# filas por bloque de predict_proba/evaluate: entradas float y, sin lote
+# reservado, entradas uint8 (con reserve, los bloques uint8 son de ese tamaño)
+EVAL_BATCH_SIZE = 1024
+UINT8_EVAL_BATCH_SIZE = 64
+
+class NeuralNetwork(Instrumented):
+    # etapas medidas con add_hook: forward/layer{i}, backward/layer{i} y optimizer_step
+    def __init__(self, input_size, hidden_size=None, output_size=1, dtype=np.float32,
+                 activations="sigmoid", output_activation="sigmoid", loss="bce",
+                 layers=None, init="auto", use_bias=True, dropout=0.0, seed=None,
+                 projection=None):
+        """
+        Args:
+            input_size: Numero de entradas (pixeles, o componentes si hay projection)
+            hidden_size: Neuronas de la primera capa oculta; sin layers la red
+                es [input_size, hidden_size, 32, output_size] como antes
+            output_size: Neuronas de salida
+            dtype: Tipo de dato de pesos, activaciones y gradientes. float32
+                mueve la mitad de bytes que float64 en cada producto matricial
+            activations: Activacion de las capas ocultas: un nombre para todas
+                o una lista con una por capa (ver utilities/Activations.py)
+            output_activation: Activacion de la capa de salida
+            loss: "bce" (entropia cruzada binaria) o "mse". Con salida
+                sigmoide y "bce" el gradiente de la salida es output - y
+            layers: Capas ocultas: lista de tamaños o de dicts
+                {"size": 128, "activation": "relu", "dropout": 0.2}; los
+                campos que falten toman activations y dropout
+            init: "xavier" (sigmoid/tanh), "he" (relu), "auto" (segun la
+                activacion de cada capa) o "normal" (N(0, 0.5), el original)
+            use_bias: Si cada capa tiene sesgo
+            dropout: Fraccion de neuronas ocultas que se apagan al entrenar
+            seed: Semilla de la inicializacion y del dropout
+            projection: Projection ya ajustada (utilities/Projection.py) que
+                convierte los pixeles en las input_size entradas de la red. Se
+                guarda con el modelo y la aplica Predictor; forward y el
+                entrenamiento reciben las entradas ya proyectadas
+        """
+        if projection is not None and projection.n_components != input_size:
+            raise ValueError(f"input_size ({input_size}) debe ser igual a los componentes de la "
+                             f"proyeccion ({projection.n_components})")
+        if layers is None:
+            if hidden_size is None:
+                raise ValueError("Se necesita hidden_size o layers")
+            layers = [hidden_size, 32]
+        layers = [spec if isinstance(spec, dict) else {"size": spec} for spec in layers]
+        if isinstance(activations, (list, tuple)):
+            if len(activations) != len(layers):
+                raise ValueError(f"Se esperaban {len(layers)} activaciones ocultas, hay {len(activations)}")
+        else:
+            activations = [activations] * len(layers)
+        if init not in INITIALIZATIONS:
+            raise ValueError(f"Inicializacion desconocida: {init} (opciones: {', '.join(INITIALIZATIONS)})")
+
+        self.dtype = np.dtype(dtype)
+        # umbral de decision y parametros de ImageProcessor, se guardan con el modelo
+        self.threshold = 0.5
+        self.preprocessing = None
+        self.projection = projection
+        self.total_layers = [input_size] + [int(spec["size"]) for spec in layers] + [output_size]
+        self.dropout = [float(spec.get("dropout", dropout)) for spec in layers] + [0.0]
+        self._rng = np.random.default_rng(seed)
+        self._set_activations(
+            [spec.get("activation", activation) for spec, activation in zip(layers, activations)]
+            + [output_activation], loss
+        )
+
+        weights = []
+        for i in range(len(self.total_layers) - 1):
+            fan_in, fan_out = self.total_layers[i], self.total_layers[i + 1]
+            weights.append(self._init_weight(fan_in, fan_out, self.activation_functions[i], init))
+        self.weights = weights
+        self.biases = [np.zeros(size, dtype=self.dtype) for size in self.total_layers[1:]] if use_bias else None
+        self._init_buffers()
+
+    def _init_weight(self, fan_in, fan_out, activation, init):
+        if init == "auto":
+            init = "he" if isinstance(activation, (ReLU, LeakyReLU)) else "xavier"
+        if init == "he":
+            scale = np.sqrt(2.0 / fan_in)
+        elif init == "xavier":
+            scale = np.sqrt(2.0 / (fan_in + fan_out))
+        else:
+            scale = 0.5
+        if self.dtype in (np.float32, np.float64):
+            # se genera directamente en el dtype: la primera capa tiene cientos de miles de filas
+            weight = self._rng.standard_normal((fan_in, fan_out), dtype=self.dtype)
+        else:
+            weight = self._rng.standard_normal((fan_in, fan_out)).astype(self.dtype)
+        weight *= self.dtype.type(scale)
+        return weight
+
+    def _set_activations(self, activations, loss):
+        if loss not in LOSSES:
+            raise ValueError(f"Perdida desconocida: {loss} (opciones: {', '.join(LOSSES)})")
+        self.activation_functions = [get_activation(spec) for spec in activations]
+        self.loss = loss
+        # sigmoide + entropia cruzada: la derivada de la salida se cancela
+        self._fused_output = loss == "bce"
+        if self._fused_output and not isinstance(self.activation_functions[-1], Sigmoid):
+            raise ValueError("La perdida bce necesita una salida sigmoid")
+
+    @property
+    def parameters(self):
+        """Pesos y sesgos, en el orden de gradients (lo que actualiza el optimizador)"""
+        return self.weights + (self.biases or [])
+
+    @property
+    def gradients(self):
+        return self.derivatives + (self.bias_derivatives or [])
+
+    def _init_buffers(self):
+        derivatives = []
+        for i in range(len(self.total_layers) - 1):
+            currentDerivative = np.zeros((self.total_layers[i], self.total_layers[i+1]), dtype=self.dtype)
+            derivatives.append(currentDerivative)
+        self.derivatives = derivatives
+        self.bias_derivatives = None
+        if self.biases is not None:
+            self.bias_derivatives = [np.zeros(size, dtype=self.dtype) for size in self.total_layers[1:]]
+
+        # buffers por capa (salvo la entrada), reutilizados en cada forward y
+        # backProp; crecen solo si llega un lote mas grande:
+        #   outputs: salida de la activacion   deltas/errors: backProp
+        #   masks/dropped: mascara de dropout y salida ya enmascarada
+        # y, si se pide en reserve, el lote uint8 convertido a float (nunca
+        # crece mas alla del lote reservado)
+        self._dropout_active = False
+        self._storage = {}
+        self._input_storage = None
+        self._reserved_batch = 0
+        self._batch_views = (0, None)
+        self._allocate(1)
+        self.activations = [np.zeros((1, self.total_layers[0]), dtype=self.dtype)] + list(self._storage["outputs"])
+
+    def _allocate(self, batch_size):
+        sizes = self.total_layers[1:]
+        for name in ("outputs", "deltas", "errors"):
+            self._storage[name] = [np.zeros((batch_size, size), dtype=self.dtype) for size in sizes]
+        for name in ("masks", "dropped"):
+            self._storage[name] = [
+                np.zeros((batch_size, size), dtype=self.dtype) if rate > 0 else None
+                for size, rate in zip(sizes, self.dropout)
+            ]
+
+    def _layer_buffers(self, batch_size):
+        """Vistas de los buffers de activacion con batch_size filas"""
+        if self._batch_views[0] == batch_size:
+            return self._batch_views[1]["outputs"]
+        if batch_size > self._storage["outputs"][0].shape[0]:
+            self._allocate(batch_size)
+        views = {
+            name: [None if buffer is None else buffer[:batch_size] for buffer in buffers]
+            for name, buffers in self._storage.items()
+        }
+        self._batch_views = (batch_size, views)
+        return views["outputs"]
+
+    def reserve(self, batch_size, uint8_inputs=False):
+        """
+        Reserva de una vez todos los buffers de activacion y de gradiente
+        para lotes de hasta batch_size filas (train_minibatch lo llama al
+        empezar, asi ningun paso de entrenamiento reserva memoria)
+
+        Args:
+            batch_size: Filas maximas por lote
+            uint8_inputs: Si tambien se reserva el lote float donde se
+                convierten las entradas uint8 (lote reservado x input_size)
+        """
+        self._reserved_batch = max(self._reserved_batch, batch_size)
+        if batch_size > self._storage["outputs"][0].shape[0]:
+            self._allocate(batch_size)
+            self._batch_views = (0, None)
+        if uint8_inputs and (self._input_storage is None or len(self._input_storage) < self._reserved_batch):
+            self._input_storage = np.zeros((self._reserved_batch, self.total_layers[0]), dtype=self.dtype)
+
+    def _eval_batch_size(self, x, batch_size):
+        """Filas por bloque de predict_proba si no se indican"""
+        if batch_size is not None:
+            return batch_size
+        if getattr(x, "dtype", None) == np.uint8:
+            # bloques del tamaño del buffer de conversion: nunca un float temporal grande
+            return self._reserved_batch or UINT8_EVAL_BATCH_SIZE
+        return EVAL_BATCH_SIZE
+
+    def layer_summary(self, batch_size=1):
+        """
+        Estimacion de costo por capa, para dimensionar un modelo antes de
+        entrenarlo
+
+        Args:
+            batch_size: Filas por lote
+
+        Returns:
+            Lista de dicts por capa con input, output, activation, dropout,
+            parameters, forward_flops, backward_flops, parameter_bytes
+            (pesos + sesgos; el gradiente ocupa lo mismo y Adam el doble) y
+            buffer_bytes (buffers de activacion y de backProp del lote)
+        """
+        itemsize = self.dtype.itemsize
+        summary = []
+        for i in range(len(self.total_layers) - 1):
+            fan_in, fan_out = self.total_layers[i], self.total_layers[i + 1]
+            activation = self.activation_functions[i]
+            elements = batch_size * fan_out
+            parameters = fan_in * fan_out + (fan_out if self.biases is not None else 0)
+            matmul = 2 * batch_size * fan_in * fan_out
+            forward_flops = matmul + elements * (ACTIVATION_FLOPS.get(activation.name, 1) + 1)
+            # gradiente de los pesos, del sesgo y delta; el error no se propaga a la entrada
+            backward_flops = matmul + 3 * elements + (matmul if i > 0 else 0)
+            buffers = 3 + (2 if self.dropout[i] > 0 else 0)
+            summary.append({
+                "layer": i,
+                "input": fan_in,
+                "output": fan_out,
+                "activation": activation.get_config(),
+                "dropout": self.dropout[i],
+                "parameters": parameters,
+                "forward_flops": forward_flops,
+                "backward_flops": backward_flops,
+                "parameter_bytes": parameters * itemsize,
+                "buffer_bytes": buffers * elements * itemsize,
+            })
+        return summary
+
+    def summary(self, batch_size=1):
+        """Tabla de layer_summary con totales, lista para imprimir"""
+        rows = self.layer_summary(batch_size)
+        lines = [f"{'capa':>4} {'forma':>18} {'activacion':>12} {'parametros':>12} "
+                 f"{'MFLOP fwd':>10} {'MFLOP bwd':>10} {'MB pesos':>9} {'MB buffers':>10}"]
+        for row in rows:
+            lines.append(
+                f"{row['layer']:>4} {str(row['input']) + ' x ' + str(row['output']):>18} {row['activation']:>12} "
+                f"{row['parameters']:>12,} {row['forward_flops'] / 1e6:>10.2f} {row['backward_flops'] / 1e6:>10.2f} "
+                f"{row['parameter_bytes'] / 2**20:>9.2f} {row['buffer_bytes'] / 2**20:>10.2f}"
+            )
+        lines.append(
+            f"total (lote de {batch_size}): {sum(r['parameters'] for r in rows):,} parametros, "
+            f"{sum(r['forward_flops'] for r in rows) / 1e6:.2f} MFLOP forward, "
+            f"{sum(r['backward_flops'] for r in rows) / 1e6:.2f} MFLOP backward, "
+            f"{sum(r['parameter_bytes'] for r in rows) / 2**20:.2f} MB de pesos"
+        )
+        return "\n".join(lines)
+    
+    def prepare_inputs(self, inputs):
+        """
+        Convierte las entradas al dtype de la red solo si hace falta
+
+        Las entradas uint8 (pixeles 0-255 sin normalizar, como las del
+        FeatureStore) se convierten y escalan por 1/255 en una sola pasada
+        dentro de un buffer float preasignado de hasta el lote reservado
+        (ver reserve); el resultado es una vista del buffer, valida hasta la
+        siguiente conversion. np.dot con uint8 y pesos float haria esa misma
+        copia en un arreglo nuevo en cada llamada (BLAS solo trabaja con
+        ambos operandos del mismo tipo). Un lote mas grande que el reservado
+        se convierte en un arreglo temporal que no se conserva.
+        """
+        inputs = np.asarray(inputs)
+        if inputs.dtype == np.uint8:
+            rows = inputs.reshape(-1, inputs.shape[-1])
+            scale = self.dtype.type(1 / 255.0)
+            if len(rows) > self._reserved_batch:
+                converted = np.multiply(rows, scale, dtype=self.dtype)
+            else:
+                if self._input_storage is None:
+                    self.reserve(self._reserved_batch, uint8_inputs=True)
+                converted = self._input_storage[:len(rows)]
+                np.multiply(rows, scale, out=converted, dtype=self.dtype)
+            return converted[0] if inputs.ndim == 1 else converted
+        if inputs.dtype != self.dtype:
+            inputs = inputs.astype(self.dtype)
+        return inputs
+
+    def forward(self,inputs, training=False):
+        """
+        Propagacion hacia adelante
+
+        No reserva memoria nueva: cada capa escribe en su buffer preasignado.
+        El resultado es una vista de ese buffer, valida hasta la siguiente
+        llamada (copiarlo si se necesita conservar).
+
+        Args:
+            inputs: Matriz (N, input_size) o un vector (input_size,)
+            training: Si se aplica dropout (solo al entrenar)
+
+        Returns:
+            Salida de la red (N, output_size), o (output_size,) para un vector
+        """
+        inputs = self.prepare_inputs(inputs)
+        single = inputs.ndim == 1
+        if single:
+            inputs = inputs.reshape(1, -1)
+        outputs = self._layer_buffers(inputs.shape[0])
+        views = self._batch_views[1]
+        self._dropout_active = training
+        self.activations[0] = inputs
+        hooks = self._hooks
+        for i, z in enumerate(outputs):
+            if hooks:
+                start = time.perf_counter()
+            np.dot(self.activations[i], self.weights[i], out=z)
+            if self.biases is not None:
+                z += self.biases[i]
+            self.activation_functions[i].forward(z, out=z)
+            if training and self.dropout[i] > 0:
+                # dropout invertido: mascara de 0 y 1/keep, sin arreglos temporales
+                keep = 1.0 - self.dropout[i]
+                mask = views["masks"][i]
+                self._rng.random(dtype=self.dtype, out=mask)
+                mask += self.dtype.type(keep)
+                np.floor(mask, out=mask)
+                mask *= self.dtype.type(1.0 / keep)
+                self.activations[i + 1] = np.multiply(z, mask, out=views["dropped"][i])
+            else:
+                self.activations[i + 1] = z
+            if hooks:
+                self._emit(f"forward/layer{i}", start, z.nbytes)
+        return outputs[-1][0] if single else outputs[-1]
+    
+    def save(self, path, preprocessing=None, threshold=None):
+        """
+        Guarda el modelo en un archivo (ver utilities/ModelFile.py)
+
+        Args:
+            path: Ruta del archivo
+            preprocessing: Parametros de ImageProcessor (get_params()) con los
+                que se entreno; por defecto self.preprocessing
+            threshold: Umbral de decision; por defecto self.threshold
+        """
+        if preprocessing is not None:
+            self.preprocessing = preprocessing
+        if threshold is not None:
+            self.threshold = threshold
+        arrays = self.parameter_arrays()
+        metadata = self.get_config()
+        # la proyeccion no forma parte de get_config/parameter_arrays: no son
+        # parametros entrenables (ParallelTrainer no la necesita)
+        if self.projection is not None:
+            metadata["projection"] = self.projection.get_config()
+            arrays.update({f"projection_{name}": array for name, array in self.projection.get_arrays().items()})
+        save_model(path, arrays, metadata)
+
+    def get_config(self):
+        """Arquitectura y metadatos del modelo en un dict serializable a JSON"""
+        return {
+            "layers": [int(size) for size in self.total_layers],
+            "dtype": self.dtype.name,
+            "preprocessing": self.preprocessing,
+            "threshold": float(self.threshold),
+            "activations": [activation.get_config() for activation in self.activation_functions],
+            "loss": self.loss,
+            "biases": self.biases is not None,
+            "dropout": self.dropout,
+        }
+
+    def parameter_arrays(self):
+        """dict nombre -> arreglo con los pesos y sesgos (nombres del archivo de modelo)"""
+        arrays = {f"weights_{i}": w for i, w in enumerate(self.weights)}
+        if self.biases is not None:
+            arrays.update({f"biases_{i}": b for i, b in enumerate(self.biases)})
+        return arrays
+
+    @classmethod
+    def load(cls, path, mmap_mode="c"):
+        """
+        Carga un modelo guardado con save
+
+        Los pesos se mapean en memoria, asi que cargar es inmediato y solo se
+        leen del disco las paginas que se usan. Con mmap_mode="c" los pesos se
+        pueden seguir entrenando sin modificar el archivo.
+
+        Args:
+            path: Ruta del archivo
+            mmap_mode: Ver ModelFile.load_model
+
+        Returns:
+            NeuralNetwork
+        """
+        arrays, metadata = load_model(path, mmap_mode)
+        network = cls.from_config(metadata, arrays)
+        if metadata.get("projection") is not None:
+            prefix = "projection_"
+            network.projection = projection_from_config(metadata["projection"], {
+                name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)
+            })
+        return network
+
+    @classmethod
+    def from_config(cls, config, arrays):
+        """
+        Construye la red con los arreglos dados, sin copiarlos (pueden ser
+        np.memmap o vistas de memoria compartida)
+
+        Args:
+            config: Resultado de get_config (o metadatos de un archivo)
+            arrays: dict de parameter_arrays
+
+        Returns:
+            NeuralNetwork
+        """
+        network = cls.__new__(cls)
+        network.dtype = np.dtype(config["dtype"])
+        network.threshold = config["threshold"]
+        network.preprocessing = config["preprocessing"]
+        network.projection = None
+        network.total_layers = list(config["layers"])
+        layer_count = len(network.total_layers) - 1
+        network.weights = [arrays[f"weights_{i}"] for i in range(layer_count)]
+        # los modelos anteriores no tienen sesgos y usan sigmoide en todas las capas
+        network.biases = None
+        if config.get("biases"):
+            network.biases = [arrays[f"biases_{i}"] for i in range(layer_count)]
+        network.dropout = list(config.get("dropout", [0.0] * layer_count))
+        network._rng = np.random.default_rng()
+        activations = config.get("activations", ["sigmoid"] * layer_count)
+        network._set_activations(activations, config.get("loss", "bce"))
+        network._init_buffers()
+        return network
+
+    def relu(self, x):
+        return np.maximum(0, x)
+    
+    def relu_der(self, x):
+        return np.where(x > 0, 1.0, 0.0)
+
+    def sigmoid(self,z, out=None):
+        z = np.asarray(z)
+        if out is None:
+            out = np.empty_like(z, dtype=np.result_type(z.dtype, np.float32))
+        return Sigmoid().forward(z, out)
+    
+    def sigmoid_der(self,z):
+        return z * (1 - z)
+    
+    def mse(self, predictedValue, expectedValue):
+        return np.mean((predictedValue - expectedValue) ** 2)/2
+
+    def bce(self, predictedValue, expectedValue, eps=1e-7):
+        """Entropia cruzada binaria promedio"""
+        p = np.clip(predictedValue, eps, 1 - eps)
+        return -np.mean(expectedValue * np.log(p) + (1 - expectedValue) * np.log1p(-p))
+
+    def loss_value(self, predictedValue, expectedValue):
+        """Valor de self.loss, el que se reporta en cada epoca"""
+        if self.loss == "bce":
+            return self.bce(predictedValue, expectedValue)
+        return self.mse(predictedValue, expectedValue)
+    
+    def accuracy(self, x, y):
+        predictions = self.predict_proba(x) > 0.5  # Umbral para clasificación
+        return np.mean(predictions == np.asarray(y).ravel())
+
+    def predict_proba(self, x, batch_size=None, indices=None):
+        """
+        Probabilidades de la primera salida, calculadas por bloques
+
+        Cada bloque es un solo producto matricial por capa, en vez de uno
+        por muestra.
+
+        Args:
+            x: Matriz (N, input_size); acepta np.memmap y uint8
+            batch_size: Filas por bloque; por defecto EVAL_BATCH_SIZE, o el
+                lote reservado (ver reserve) si x es uint8
+            indices: Filas de x a evaluar (por defecto todas). Solo se leen
+                las filas del bloque actual: con un memmap no se copia el
+                subconjunto completo a memoria (conviene pasarlas ordenadas)
+
+        Returns:
+            probabilities: Arreglo (N,), o (len(indices),) en el orden de indices
+        """
+        batch_size = self._eval_batch_size(x, batch_size)
+        if indices is not None:
+            indices = np.asarray(indices)
+        count = len(x) if indices is None else len(indices)
+        probabilities = np.empty(count, dtype=self.dtype)
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            rows = x[start:end] if indices is None else x[indices[start:end]]
+            probabilities[start:end] = self.forward(rows)[:, 0]
+        return probabilities
+
+    def evaluate(self, x, y, batch_size=None, threshold=None, indices=None):
+        """
+        Evalua la red sobre un conjunto de prueba
+
+        Args:
+            x: Matriz (N, input_size)
+            y: Etiquetas (0 o 1)
+            batch_size: Filas por bloque (ver predict_proba)
+            threshold: Umbral de decision; por defecto self.threshold
+            indices: Filas de x e y a evaluar (ver predict_proba)
+
+        Returns:
+            dict con probabilities, accuracy, precision, recall, f1, auc,
+            confusion_matrix y roc (ver utilities/Metrics.py)
+        """
+        if threshold is None:
+            threshold = self.threshold
+        probabilities = self.predict_proba(x, batch_size, indices)
+        if indices is not None:
+            y = np.asarray(y)[indices]
+        report = binary_report(y, probabilities, threshold)
+        report["probabilities"] = probabilities
+        return report
+    
+    def backProp(self, error):
+        """
+        Calcula los gradientes del ultimo forward en self.derivatives (y
+        self.bias_derivatives)
+
+        Cada gradiente se calcula una sola vez y se escribe en su buffer. El
+        error no se propaga hacia la capa de entrada: nadie lo usa y seria
+        el producto mas caro (N x input_size).
+
+        Args:
+            error: output - y; con salida sigmoide y perdida bce es
+                directamente el delta de la ultima capa
+        """
+        views = self._batch_views[1]
+        error = np.asarray(error, dtype=self.dtype)
+        last = len(self.weights) - 1
+        hooks = self._hooks
+        for i in range(last, -1, -1):
+            if hooks:
+                start = time.perf_counter()
+            if i == last and self._fused_output:
+                delta = error
+            else:
+                # la derivada se evalua en la salida sin dropout
+                delta = self.activation_functions[i].derivative(views["outputs"][i], out=views["deltas"][i])
+                delta *= error
+                if self._dropout_active and self.dropout[i] > 0:
+                    delta *= views["masks"][i]
+            np.dot(self.activations[i].T, delta, out=self.derivatives[i])
+            if self.biases is not None:
+                np.sum(delta, axis=0, out=self.bias_derivatives[i])
+            if i > 0:
+                error = np.dot(delta, self.weights[i].T, out=views["errors"][i - 1])
+            if hooks:
+                self._emit(f"backward/layer{i}", start, self.derivatives[i].nbytes)
+
+    def _total_loss(self, output, y):
+        """Perdida sumada sobre el lote, la que derivan backProp/derivatives"""
+        if self.loss == "bce":
+            return self.bce(output, y) * output.size
+        return self.mse(output, y) * output.size
+
+    def gradient_check(self, x, y, epsilon=1e-5, samples=20, seed=None):
+        """
+        Compara los gradientes de backProp con diferencias finitas centrales
+        en samples pesos (y sesgos) elegidos al azar de cada capa
+
+        Usar una red con dtype=np.float64; en float32 el redondeo domina la
+        diferencia finita.
+
+        Args:
+            x: Matriz (N, input_size) pequeña
+            y: Etiquetas (N,) o (N, output_size)
+            epsilon: Paso de la diferencia finita
+            samples: Pesos revisados por capa
+            seed: Semilla para elegir los pesos
+
+        Returns:
+            Mayor error relativo |analitico - numerico| / max(|a| + |n|, 1e-12)
+        """
+        rng = np.random.default_rng(seed)
+        x = self.prepare_inputs(x)
+        y = np.asarray(y, dtype=self.dtype).reshape(len(x), -1)
+        output = self.forward(x)
+        self.backProp(output - y)
+        analytic = [d.copy() for d in self.gradients]
+        worst = 0.0
+        for w, gradient in zip(self.parameters, analytic):
+            for flat_index in rng.choice(w.size, size=min(samples, w.size), replace=False):
+                index = np.unravel_index(flat_index, w.shape)
+                original = w[index]
+                w[index] = original + epsilon
+                loss_plus = self._total_loss(self.forward(x), y)
+                w[index] = original - epsilon
+                loss_minus = self._total_loss(self.forward(x), y)
+                w[index] = original
+                numeric = (loss_plus - loss_minus) / (2 * epsilon)
+                error = abs(gradient[index] - numeric) / max(abs(gradient[index]) + abs(numeric), 1e-12)
+                worst = max(worst, float(error))
+        return worst
+
+    def optimizer_step(self, optimizer):
+        """Aplica optimizer a los gradientes del ultimo backProp"""
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        optimizer.step(self.parameters, self.gradients)
+        if hooks:
+            self._emit("optimizer_step", start)
+
+    def gradient_descent(self,learning_rate):
+        for w, d in zip(self.parameters, self.gradients):
+            w -= d * learning_rate
+
+    def validation_loss(self, x, y, indices=None, batch_size=None):
+        """
+        Perdida (self.loss) sobre un conjunto completo, por bloques
+
+        indices va antes de batch_size para que una tupla de validacion
+        (x, y, indices) se pueda pasar como validation_loss(*validation).
+        """
+        probabilities = self.predict_proba(x, batch_size, indices)
+        if indices is not None:
+            y = np.asarray(y)[indices]
+        return float(self.loss_value(probabilities, np.asarray(y, dtype=self.dtype).ravel()))
+
+    def train(self, x, y, learning_rate, max_error, max_epochs, optimizer=None):
+        x = self.prepare_inputs(x)
+        y = np.asarray(y, dtype=self.dtype)
+        optimizer = get_optimizer(optimizer, learning_rate)
+        err_mse = 1
+        errors = []
+        epoch = 0
+        while err_mse > max_error and epoch < max_epochs:
+            optimizer.start_epoch(epoch)
+            output = self.forward(x, training=True)
+            error = output - y
+            self.backProp(error)
+            self.optimizer_step(optimizer)
+            err_mse = self.loss_value(output,y)
+            errors.append(err_mse) 
+            print(f"epoca {epoch + 1} de {max_epochs} error actual {err_mse}")
+            epoch += 1
+        if err_mse <= max_error:
+            print(f"Entrenamiento finalizado: error mínimo alcanzado ({err_mse:.5f}) en {epoch} épocas.")
+        elif epoch >= max_epochs:
+            print(f"Entrenamiento detenido: se alcanzó el máximo de {max_epochs} épocas.")
+        return errors
+
+    def _iter_source(self, source, batch_size, shuffle, rng):
+        """
+        Entrega los lotes (x, y) de una epoca a partir de la fuente de datos
+
+        source puede ser:
+            - un objeto con iter_batches (p. ej. FeatureStore)
+            - una tupla (x, y) de arreglos o np.memmap
+            - una funcion sin argumentos que devuelve un iterable de (x, y)
+        """
+        if hasattr(source, "iter_batches"):
+            seed = rng.integers(2**32) if shuffle else None
+            yield from source.iter_batches(batch_size, shuffle=shuffle, seed=seed, dtype=self.dtype)
+        elif isinstance(source, tuple):
+            x, y = source
+            y = np.asarray(y)
+            indices = rng.permutation(len(x)) if shuffle else np.arange(len(x))
+            for start in range(0, len(indices), batch_size):
+                # ordenar el lote mejora la lectura secuencial de un memmap
+                batch = np.sort(indices[start:start + batch_size])
+                # uint8 se entrega tal cual, forward lo convierte (ver prepare_inputs)
+                yield np.asarray(x[batch]), y[batch]
+        elif callable(source):
+            yield from source()
+        else:
+            raise TypeError(f"Fuente de datos no soportada: {type(source).__name__}")
+
+    def train_minibatch(self, source, learning_rate, max_epochs, batch_size=32,
+                        shuffle=True, max_error=0.0, seed=None, optimizer=None,
+                        validation=None, patience=10, min_delta=0.0, restore_best=True):
+        """
+        Entrena por mini-lotes sin cargar el dataset completo en memoria
+
+        Args:
+            source: Fuente de datos (ver _iter_source)
+            learning_rate: Tasa de aprendizaje (si optimizer es un nombre)
+            max_epochs: Numero maximo de epocas
+            batch_size: Tamaño de cada lote
+            shuffle: Si se baraja el orden de las muestras en cada epoca
+            max_error: Se detiene cuando la perdida de una epoca es menor o igual
+            seed: Semilla del barajado
+            optimizer: None (SGD simple), "momentum", "adam", "rmsprop" o un
+                Optimizer ya configurado (ver utilities/Optimizers.py)
+            validation: Tupla (x_val, y_val) para detenerse temprano, o
+                (x, y, indices) para evaluar solo esas filas por bloques sin
+                copiarlas (p. ej. store.features, store.labels, val_idx)
+            patience: Epocas sin mejora de la perdida de validacion antes de
+                detenerse
+            min_delta: Mejora minima que cuenta como mejora
+            restore_best: Si al terminar se regresan los pesos de la mejor
+                epoca de validacion
+
+        Returns:
+            errors: Perdida promedio (self.loss) por epoca; las de validacion
+            quedan en self.history["val_loss"]
+        """
+        rng = np.random.default_rng(seed)
+        optimizer = get_optimizer(optimizer, learning_rate)
+        errors = []
+        val_errors = []
+        self.history = {"loss": errors, "val_loss": val_errors}
+        best_loss = np.inf
+        best_weights = None
+        best_epoch = 0
+        # una tupla uint8 (p. ej. un memmap del almacen) usa el buffer de conversion
+        uint8_source = isinstance(source, tuple) and getattr(source[0], "dtype", None) == np.uint8
+        self.reserve(batch_size, uint8_inputs=uint8_source)
+        for epoch in range(max_epochs):
+            optimizer.start_epoch(epoch)
+            total_error = 0.0
+            total_samples = 0
+            for x_batch, y_batch in self._iter_source(source, batch_size, shuffle, rng):
+                y_batch = np.asarray(y_batch, dtype=self.dtype).reshape(-1, 1)
+                output = self.forward(x_batch, training=True)
+                self.backProp(output - y_batch)
+                self.optimizer_step(optimizer)
+                total_error += self.loss_value(output, y_batch) * len(y_batch)
+                total_samples += len(y_batch)
+            err_mse = total_error / max(total_samples, 1)
+            errors.append(err_mse)
+            if validation is None:
+                print(f"epoca {epoch + 1} de {max_epochs} error actual {err_mse}")
+            else:
+                val_loss = self.validation_loss(*validation)
+                val_errors.append(val_loss)
+                print(f"epoca {epoch + 1} de {max_epochs} error actual {err_mse} validacion {val_loss}")
+                if val_loss < best_loss - min_delta:
+                    best_loss = val_loss
+                    best_epoch = epoch
+                    if restore_best:
+                        # copias reservadas una sola vez y sobrescritas en cada mejora
+                        if best_weights is None:
+                            best_weights = [np.array(w, copy=True) for w in self.parameters]
+                        else:
+                            for best, w in zip(best_weights, self.parameters):
+                                np.copyto(best, w)
+                elif epoch - best_epoch >= patience:
+                    print(f"Entrenamiento detenido: sin mejora en validacion desde la época {best_epoch + 1}.")
+                    break
+            if err_mse <= max_error:
+                print(f"Entrenamiento finalizado: error mínimo alcanzado ({err_mse:.5f}) en {epoch + 1} épocas.")
+                break
+        if best_weights is not None:
+            for best, w in zip(best_weights, self.parameters):
+                np.copyto(w, best)
+        return errors
@@ -0,0 +1,323 @@
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+import numpy as np
+from .NeuralNetwork import NeuralNetwork
+from .utilities.FeatureStore import FeatureStore
+from .utilities.Optimizers import get_optimizer
+
+# variables que leen las distintas implementaciones de BLAS/OpenMP al importar numpy
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS",
+)
+STEP, STOP = 1, 0
+# cada parametro empieza alineado a 64 bytes dentro del bloque compartido
+_ALIGN_ELEMENTS = 16
+
+def _layout(arrays):
+    """Posicion (en elementos) de cada arreglo dentro de un bloque plano"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = (offset + _ALIGN_ELEMENTS - 1) // _ALIGN_ELEMENTS * _ALIGN_ELEMENTS
+        layout[name] = (offset, tuple(array.shape))
+        offset += array.size
+    return layout, offset
+
+def _views(flat, layout):
+    return {name: flat[offset:offset + int(np.prod(shape))].reshape(shape)
+            for name, (offset, shape) in layout.items()}
+
+def _worker(rank, workers, setup, barriers):
+    start_barrier, done_barrier, reduce_barrier = barriers
+    segments = []
+    try:
+        def attach(name):
+            segment = shared_memory.SharedMemory(name=name)
+            segments.append(segment)
+            return segment
+        dtype = np.dtype(setup["config"]["dtype"])
+        total = setup["total"]
+        params = np.ndarray((total,), dtype=dtype, buffer=attach(setup["params"]).buf)
+        grads = np.ndarray((workers + 1, total), dtype=dtype, buffer=attach(setup["grads"]).buf)
+        control = np.ndarray((3,), dtype=np.int64, buffer=attach(setup["control"]).buf)
+        stats = np.ndarray((workers, 2), dtype=np.float64, buffer=attach(setup["stats"]).buf)
+
+        # la red usa directamente la memoria compartida: los pesos que
+        # actualiza el proceso principal y la fila de gradientes de este proceso
+        network = NeuralNetwork.from_config(setup["config"], _views(params, setup["layout"]))
+        network._rng = np.random.default_rng([setup["seed"], rank])
+        gradients = _views(grads[rank], setup["layout"])
+        layer_count = len(network.weights)
+        network.derivatives = [gradients[f"weights_{i}"] for i in range(layer_count)]
+        if network.biases is not None:
+            network.bias_derivatives = [gradients[f"biases_{i}"] for i in range(layer_count)]
+        batch_size = setup["batch_size"]
+        # los lotes del almacen llegan en uint8
+        network.reserve(batch_size, uint8_inputs=True)
+
+        store = FeatureStore(setup["store"])
+        features, labels = store.features, store.labels
+        shard = np.array_split(setup["indices"], workers)[rank]
+        rng = np.random.default_rng([setup["seed"], rank, 1])
+        # cada proceso reduce una franja de los gradientes
+        bounds = np.linspace(0, total, workers + 1).astype(np.int64)
+        low, high = bounds[rank], bounds[rank + 1]
+        order = shard
+
+        while True:
+            start_barrier.wait()
+            command, epoch, step = control
+            if command == STOP:
+                break
+            if step == 0 and setup["shuffle"]:
+                order = rng.permutation(shard)
+            batch = np.sort(order[step * batch_size:(step + 1) * batch_size])
+            if len(batch) == 0:
+                # este fragmento ya se agoto en la epoca: no aporta gradiente
+                grads[rank].fill(0)
+                stats[rank] = (0.0, 0.0)
+            else:
+                y_batch = labels[batch].astype(dtype).reshape(-1, 1)
+                output = network.forward(features[batch], training=True)
+                network.backProp(output - y_batch)
+                stats[rank] = (network.loss_value(output, y_batch) * len(batch), len(batch))
+            done_barrier.wait()
+            np.sum(grads[:workers, low:high], axis=0, out=grads[workers, low:high])
+            reduce_barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    except Exception:
+        traceback.print_exc(file=sys.stderr)
+        for barrier in barriers:
+            barrier.abort()
+    finally:
+        for segment in segments:
+            segment.close()
+
+class ParallelTrainer:
+    """
+    Entrenamiento con paralelismo de datos en varios procesos
+
+    Cada proceso lee su fragmento del FeatureStore (np.memmap, nada se copia
+    entre procesos), calcula el gradiente de su mini-lote y lo escribe en su
+    fila de un bloque de memoria compartida. Los procesos suman los
+    gradientes por franjas y el proceso principal aplica el optimizador
+    sobre los pesos, que tambien viven en memoria compartida: ninguna
+    matriz de pesos ni de gradientes se serializa.
+
+    Para no saturar los nucleos, cada proceso usa threads_per_worker hilos
+    de BLAS (se fijan OMP_NUM_THREADS, MKL_NUM_THREADS, OPENBLAS_NUM_THREADS,
+    ... antes de crearlo) y por defecto workers = nucleos / threads_per_worker.
+    """
+
+    def __init__(self, network, workers=None, threads_per_worker=1, timeout=600):
+        """
+        Args:
+            network: NeuralNetwork a entrenar (se actualiza en su lugar)
+            workers: Numero de procesos
+            threads_per_worker: Hilos de BLAS por proceso
+            timeout: Segundos maximos de espera por paso antes de darlo por fallido
+        """
+        self.network = network
+        self.threads_per_worker = max(1, threads_per_worker)
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 1) // self.threads_per_worker)
+        self.workers = workers
+        self.timeout = timeout
+
+    def _spawn(self, context, setup, barriers):
+        # los procesos "spawn" heredan el entorno al crearse y leen estas
+        # variables al importar numpy, antes de que BLAS cree sus hilos
+        previous = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        os.environ.update({name: str(self.threads_per_worker) for name in THREAD_ENV_VARS})
+        try:
+            processes = []
+            for rank in range(self.workers):
+                process = context.Process(target=_worker, args=(rank, self.workers, setup, barriers), daemon=True)
+                process.start()
+                processes.append(process)
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        return processes
+
+    def _wait(self, barrier):
+        try:
+            barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            raise RuntimeError("Un proceso de entrenamiento fallo (ver el error arriba)") from None
+
+    def train(self, store, learning_rate, max_epochs, batch_size=32, indices=None, shuffle=True,
+              max_error=0.0, seed=None, optimizer=None, validation=None, patience=10,
+              min_delta=0.0, restore_best=True):
+        """
+        Entrena la red con varios procesos (ver NeuralNetwork.train_minibatch)
+
+        Args:
+            store: FeatureStore o su directorio
+            learning_rate: Tasa de aprendizaje (si optimizer es un nombre)
+            max_epochs: Numero maximo de epocas
+            batch_size: Tamaño del lote de cada proceso; el lote efectivo de
+                cada paso es batch_size * workers
+            indices: Filas del almacen usadas para entrenar (por defecto todas)
+            shuffle: Si cada proceso baraja su fragmento en cada epoca
+            max_error: Se detiene cuando la perdida de una epoca es menor o igual
+            seed: Semilla del barajado y del dropout
+            optimizer: Ver NeuralNetwork.train_minibatch
+            validation: Tupla (x_val, y_val) o (x, y, indices) para detenerse
+                temprano (ver NeuralNetwork.train_minibatch)
+            patience: Epocas sin mejora de la perdida de validacion
+            min_delta: Mejora minima que cuenta como mejora
+            restore_best: Si al terminar se regresan los pesos de la mejor epoca
+
+        Returns:
+            errors: Perdida promedio por epoca (validacion en network.history)
+
+        Raises:
+            ValueError si la red tiene proyeccion de entrada o si su numero de
+            entradas no coincide con el del almacen
+        """
+        network = self.network
+        if network.projection is not None:
+            # los procesos leen filas crudas del almacen y no aplican la proyeccion
+            raise ValueError("ParallelTrainer no soporta redes con proyeccion de entrada; "
+                             "entrenar con NeuralNetwork.train_minibatch sobre las filas proyectadas")
+        store_dir = store.directory if isinstance(store, FeatureStore) else store
+        store_size = FeatureStore(store_dir).feature_size
+        if network.total_layers[0] != store_size:
+            raise ValueError(f"La red espera {network.total_layers[0]} entradas y el almacen "
+                             f"tiene {store_size} por fila")
+        if indices is None:
+            indices = np.arange(len(FeatureStore(store_dir)))
+        indices = np.asarray(indices, dtype=np.int64)
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2**31))
+        optimizer = get_optimizer(optimizer, learning_rate)
+        workers = self.workers
+
+        arrays = network.parameter_arrays()
+        layout, total = _layout(arrays)
+        itemsize = network.dtype.itemsize
+        segments = [
+            shared_memory.SharedMemory(create=True, size=max(total * itemsize, 1)),
+            shared_memory.SharedMemory(create=True, size=max((workers + 1) * total * itemsize, 1)),
+            shared_memory.SharedMemory(create=True, size=3 * 8),
+            shared_memory.SharedMemory(create=True, size=workers * 2 * 8),
+        ]
+        processes = []
+        bound = False
+        try:
+            params = np.ndarray((total,), dtype=network.dtype, buffer=segments[0].buf)
+            grads = np.ndarray((workers + 1, total), dtype=network.dtype, buffer=segments[1].buf)
+            control = np.ndarray((3,), dtype=np.int64, buffer=segments[2].buf)
+            stats = np.ndarray((workers, 2), dtype=np.float64, buffer=segments[3].buf)
+            # la red del proceso principal pasa a usar los pesos compartidos
+            shared_params = _views(params, layout)
+            for name, array in arrays.items():
+                shared_params[name][...] = array
+            self._bind(network, shared_params)
+            bound = True
+            summed = _views(grads[workers], layout)
+            summed_gradients = [summed[name] for name in arrays]
+            parameters = network.parameters
+
+            setup = {
+                "config": network.get_config(), "layout": layout, "total": total,
+                "params": segments[0].name, "grads": segments[1].name,
+                "control": segments[2].name, "stats": segments[3].name,
+                "store": store_dir, "indices": indices, "batch_size": batch_size,
+                "shuffle": shuffle, "seed": seed,
+            }
+            context = multiprocessing.get_context("spawn")
+            barriers = tuple(context.Barrier(workers + 1) for _ in range(3))
+            start_barrier, done_barrier, reduce_barrier = barriers
+            processes = self._spawn(context, setup, barriers)
+
+            shard_sizes = [len(shard) for shard in np.array_split(indices, workers)]
+            steps = math.ceil(max(shard_sizes) / batch_size)
+            errors = []
+            val_errors = []
+            network.history = {"loss": errors, "val_loss": val_errors}
+            best_loss = np.inf
+            best_weights = None
+            best_epoch = 0
+            for epoch in range(max_epochs):
+                optimizer.start_epoch(epoch)
+                total_error = 0.0
+                total_samples = 0
+                for step in range(steps):
+                    # los ganchos de la red solo ven este proceso: el lote
+                    # completo de los trabajadores cuenta como una etapa
+                    hooks = network._hooks
+                    if hooks:
+                        start = time.perf_counter()
+                    control[:] = (STEP, epoch, step)
+                    self._wait(start_barrier)
+                    self._wait(done_barrier)
+                    self._wait(reduce_barrier)
+                    if hooks:
+                        network._emit("parallel/workers", start)
+                        start = time.perf_counter()
+                    optimizer.step(parameters, summed_gradients)
+                    if hooks:
+                        network._emit("optimizer_step", start)
+                    total_error += stats[:, 0].sum()
+                    total_samples += stats[:, 1].sum()
+                err_mse = total_error / max(total_samples, 1)
+                errors.append(err_mse)
+                if validation is None:
+                    print(f"epoca {epoch + 1} de {max_epochs} error actual {err_mse}")
+                else:
+                    val_loss = network.validation_loss(*validation)
+                    val_errors.append(val_loss)
+                    print(f"epoca {epoch + 1} de {max_epochs} error actual {err_mse} validacion {val_loss}")
+                    if val_loss < best_loss - min_delta:
+                        best_loss = val_loss
+                        best_epoch = epoch
+                        if restore_best:
+                            if best_weights is None:
+                                best_weights = [np.array(w, copy=True) for w in parameters]
+                            else:
+                                for best, w in zip(best_weights, parameters):
+                                    np.copyto(best, w)
+                    elif epoch - best_epoch >= patience:
+                        print(f"Entrenamiento detenido: sin mejora en validacion desde la época {best_epoch + 1}.")
+                        break
+                if err_mse <= max_error:
+                    print(f"Entrenamiento finalizado: error mínimo alcanzado ({err_mse:.5f}) en {epoch + 1} épocas.")
+                    break
+            if best_weights is not None:
+                for best, w in zip(best_weights, parameters):
+                    np.copyto(w, best)
+
+            control[0] = STOP
+            self._wait(start_barrier)
+            return errors
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            # los pesos se copian fuera de la memoria compartida antes de liberarla
+            if bound:
+                self._bind(network, {name: np.array(array) for name, array in network.parameter_arrays().items()})
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    @staticmethod
+    def _bind(network, arrays):
+        layer_count = len(network.weights)
+        network.weights = [arrays[f"weights_{i}"] for i in range(layer_count)]
+        if network.biases is not None:
+            network.biases = [arrays[f"biases_{i}"] for i in range(layer_count)]
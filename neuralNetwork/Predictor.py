@@ -0,0 +1,128 @@
+import numpy as np
+from .NeuralNetwork import NeuralNetwork
+from .utilities.ImageProcessor import ImageProcessor
+
+class Predictor:
+    """
+    Inferencia con un modelo entrenado
+
+    Carga el modelo una sola vez y reutiliza el mismo ImageProcessor (con
+    los parametros guardados en el modelo) para todas las predicciones.
+    """
+
+    def __init__(self, model_path=None, network=None, processor=None, batch_size=32):
+        """
+        Args:
+            model_path: Archivo guardado con NeuralNetwork.save
+            network: NeuralNetwork ya construida (alternativa a model_path)
+            processor: ImageProcessor a usar; por defecto el del modelo
+            batch_size: Imagenes por lote en predict_paths
+        """
+        if network is None:
+            if model_path is None:
+                raise ValueError("Se necesita model_path o network")
+            network = NeuralNetwork.load(model_path, mmap_mode="r")
+        self.network = network
+        if processor is None:
+            if network.preprocessing:
+                processor = ImageProcessor.from_params(network.preprocessing)
+            else:
+                processor = ImageProcessor()
+        self.processor = processor
+        self.batch_size = batch_size
+        # lote de entrada en uint8 reutilizado por predict_paths
+        self._input_batch = np.empty((batch_size, processor.feature_size), dtype=np.uint8)
+        # y el buffer float donde la red lo convierte (sin proyeccion)
+        network.reserve(batch_size, uint8_inputs=network.projection is None)
+
+    @property
+    def threshold(self):
+        return self.network.threshold
+
+    def _forward(self, inputs):
+        """forward de la red; si el modelo tiene proyeccion, se aplica antes a los pixeles"""
+        projection = self.network.projection
+        if projection is not None:
+            inputs = projection.transform(inputs)
+        return self.network.forward(inputs)
+
+    def image_to_input(self, image):
+        """
+        Convierte una imagen PIL (o una ruta) al vector uint8 que espera la red
+        """
+        return self.processor.process_batch([image])[0]
+
+    def predict_one(self, image):
+        """
+        Args:
+            image: Imagen PIL o ruta del archivo
+
+        Returns:
+            probability: Probabilidad (0 a 1) de que sea la persona
+        """
+        return float(self._forward(self.image_to_input(image))[0])
+
+    def predict_batch(self, inputs, out=None):
+        """
+        Args:
+            inputs: Matriz (N, feature_size) en uint8 o float
+            out: Arreglo (N,) opcional donde escribir el resultado
+
+        Returns:
+            probabilities: Arreglo (N,)
+        """
+        output = self._forward(inputs)[:, 0]
+        if out is None:
+            return output.copy()
+        out[:] = output
+        return out
+
+    def predict_images(self, images):
+        """
+        Args:
+            images: Imagenes PIL o rutas (a lo mas batch_size)
+
+        Returns:
+            probabilities: Arreglo (N,)
+        """
+        inputs = self.processor.process_batch(images, out=self._input_batch)
+        return self.predict_batch(inputs)
+
+    def iter_predict_paths(self, paths, workers=1, cancel_event=None):
+        """
+        Predice una lista de archivos por lotes, entregando resultados a medida
+        que se completa cada lote
+
+        Args:
+            paths: Rutas de las imagenes
+            workers: Procesos para decodificar (ver ImageProcessor.iter_processing)
+            cancel_event: threading.Event opcional; se revisa entre imagenes
+                decodificadas y al activarse termina sin evaluar el lote en curso
+
+        Yields:
+            (path, probability); las imagenes que no se pudieron leer se omiten
+        """
+        batch_paths = []
+        for path, raw_vector, _ in self.processor.iter_processing(
+                None, workers=workers, normalize=False, files=list(paths), cancel_event=cancel_event):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            self._input_batch[len(batch_paths)] = raw_vector
+            batch_paths.append(path)
+            if len(batch_paths) == self.batch_size:
+                yield from self._flush(batch_paths)
+                batch_paths = []
+        if batch_paths and not (cancel_event is not None and cancel_event.is_set()):
+            yield from self._flush(batch_paths)
+
+    def _flush(self, batch_paths):
+        probabilities = self._forward(self._input_batch[:len(batch_paths)])[:, 0]
+        for path, probability in zip(batch_paths, probabilities):
+            yield path, float(probability)
+
+    def predict_paths(self, paths, workers=1):
+        """
+        Returns:
+            Lista de (path, probability) (ver iter_predict_paths)
+        """
+        return list(self.iter_predict_paths(paths, workers))
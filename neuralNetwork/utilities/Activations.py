@@ -0,0 +1,104 @@
+import numpy as np
+
+# Funciones de activacion por capa. Todas escriben en el buffer out (puede
+# ser el mismo arreglo de entrada) y calculan la derivada a partir de la
+# salida de la capa, asi backProp no necesita guardar z.
+
+class Activation:
+    name = None
+
+    def forward(self, z, out):
+        raise NotImplementedError
+
+    def derivative(self, a, out):
+        """Escribe en out la derivada evaluada en la salida a = f(z)"""
+        raise NotImplementedError
+
+    def get_config(self):
+        return self.name
+
+class Sigmoid(Activation):
+    name = "sigmoid"
+
+    def forward(self, z, out):
+        """
+        Sigmoide estable: solo se calcula exp(-|z|), que nunca se desborda
+
+            z >= 0: 1 / (1 + exp(-z))
+            z <  0: 1 - 1 / (1 + exp(z))
+        """
+        negative = z < 0
+        np.abs(z, out=out)
+        np.negative(out, out=out)
+        np.exp(out, out=out)
+        out += 1
+        np.reciprocal(out, out=out)
+        np.subtract(1, out, out=out, where=negative)
+        return out
+
+    def derivative(self, a, out):
+        np.subtract(1, a, out=out)
+        out *= a
+        return out
+
+class Tanh(Activation):
+    name = "tanh"
+
+    def forward(self, z, out):
+        return np.tanh(z, out=out)
+
+    def derivative(self, a, out):
+        np.square(a, out=out)
+        np.subtract(1, out, out=out)
+        return out
+
+class ReLU(Activation):
+    name = "relu"
+
+    def forward(self, z, out):
+        return np.maximum(z, 0, out=out)
+
+    def derivative(self, a, out):
+        return np.greater(a, 0, out=out)
+
+class LeakyReLU(Activation):
+    name = "leaky_relu"
+
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+
+    def forward(self, z, out):
+        if out is not z:
+            np.copyto(out, z)
+        # solo se multiplican los valores negativos
+        return np.multiply(out, out.dtype.type(self.alpha), out=out, where=out < 0)
+
+    def derivative(self, a, out):
+        # con alpha > 0 el signo de a es el de z
+        np.greater(a, 0, out=out)
+        out *= out.dtype.type(1 - self.alpha)
+        out += out.dtype.type(self.alpha)
+        return out
+
+    def get_config(self):
+        return f"{self.name}:{self.alpha}"
+
+ACTIVATIONS = {cls.name: cls for cls in (Sigmoid, Tanh, ReLU, LeakyReLU)}
+
+def get_activation(spec):
+    """
+    Args:
+        spec: Activation, nombre ("sigmoid", "tanh", "relu", "leaky_relu")
+            o nombre con parametro ("leaky_relu:0.1")
+
+    Returns:
+        Activation
+    """
+    if isinstance(spec, Activation):
+        return spec
+    name, _, argument = spec.partition(":")
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Activacion desconocida: {name} (opciones: {', '.join(ACTIVATIONS)})")
+    if argument:
+        return ACTIVATIONS[name](float(argument))
+    return ACTIVATIONS[name]()
@@ -0,0 +1,152 @@
+import json
+import math
+import os
+from PIL import Image
+
+DEFAULT_CASCADE = "haarcascade_frontalface_default.xml"
+EYE_CASCADE = "haarcascade_eye.xml"
+
+def _cascade_path(cv2, cascade):
+    """Acepta un nombre de las cascadas que trae OpenCV o una ruta a un .xml"""
+    if os.path.isfile(cascade):
+        return cascade
+    bundled = os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""), cascade)
+    if os.path.isfile(bundled):
+        return bundled
+    raise FileNotFoundError(f"No se encontro la cascada {cascade}")
+
+class FaceDetector:
+    """
+    Localiza el rostro principal de una imagen con las cascadas de OpenCV
+    (funcionan sin conexion) y estima su inclinacion a partir de los ojos
+
+    Las detecciones se guardan en cache_dir, un archivo JSON por imagen
+    nombrado con el hash de su contenido; los archivos se escriben de forma
+    atomica, asi que varios procesos del pool pueden compartir el cache.
+    Las coordenadas se guardan relativas (0 a 1) para no depender de la
+    resolucion con la que se decodifico la imagen.
+    """
+
+    def __init__(self, cascade=DEFAULT_CASCADE, cache_dir=None, detection_size=640,
+                 min_face=0.1, align=True):
+        """
+        Args:
+            cascade: Nombre de una cascada de OpenCV o ruta a un .xml
+            cache_dir: Directorio del cache de detecciones (None para no usarlo)
+            detection_size: Lado mayor de la imagen sobre la que se detecta
+            min_face: Tamaño minimo del rostro, como fraccion del lado menor
+            align: Si se estima el angulo de los ojos para enderezar el rostro
+        """
+        try:
+            import cv2
+        except ImportError as e:
+            raise ImportError("El recorte de rostros necesita OpenCV (pip install opencv-python)") from e
+        self.cv2 = cv2
+        self.cascade = cascade
+        self.classifier = cv2.CascadeClassifier(_cascade_path(cv2, cascade))
+        self.eye_classifier = cv2.CascadeClassifier(_cascade_path(cv2, EYE_CASCADE)) if align else None
+        self.cache_dir = cache_dir
+        self.detection_size = detection_size
+        self.min_face = min_face
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_file(self, cache_key):
+        name = f"{cache_key}_{os.path.splitext(os.path.basename(self.cascade))[0]}.json"
+        return os.path.join(self.cache_dir, name)
+
+    def detect(self, gray, cache_key=None):
+        """
+        Args:
+            gray: Arreglo uint8 (alto, ancho) en blanco y negro
+            cache_key: Identificador de la imagen (hash del contenido) o None
+
+        Returns:
+            dict {"box": [x, y, w, h] relativos, "angle": grados} o None si
+            no se encontro un rostro
+        """
+        cache_file = None
+        if cache_key is not None and self.cache_dir is not None:
+            cache_file = self._cache_file(cache_key)
+            try:
+                with open(cache_file) as f:
+                    return json.load(f)["face"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        face = self._detect(gray)
+
+        if cache_file is not None:
+            tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"face": face}, f)
+            os.replace(tmp_path, cache_file)
+        return face
+
+    def _detect(self, gray):
+        cv2 = self.cv2
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.detection_size / max(width, height))
+        small = gray
+        if scale < 1.0:
+            small = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        small = cv2.equalizeHist(small)
+        min_side = max(20, int(min(small.shape[:2]) * self.min_face))
+        faces = self.classifier.detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda box: box[2] * box[3])
+        angle = 0.0
+        if self.eye_classifier is not None:
+            angle = self._eye_angle(small[y:y + h // 2 + h // 8, x:x + w])
+        small_height, small_width = small.shape[:2]
+        return {
+            "box": [x / small_width, y / small_height, w / small_width, h / small_height],
+            "angle": angle,
+        }
+
+    def _eye_angle(self, face_top):
+        """Angulo (grados) de la linea entre los dos ojos; 0 si no se encuentran"""
+        eyes = self.eye_classifier.detectMultiScale(face_top, scaleFactor=1.1, minNeighbors=5)
+        if len(eyes) < 2:
+            return 0.0
+        eyes = sorted(eyes, key=lambda box: box[2] * box[3], reverse=True)[:2]
+        (x1, y1, w1, h1), (x2, y2, w2, h2) = sorted(eyes, key=lambda box: box[0])
+        dx = (x2 + w2 / 2) - (x1 + w1 / 2)
+        dy = (y2 + h2 / 2) - (y1 + h1 / 2)
+        angle = math.degrees(math.atan2(dy, dx))
+        # angulos grandes suelen ser detecciones falsas
+        return angle if abs(angle) <= 30 else 0.0
+
+    @staticmethod
+    def crop(pil_image, face, output_size, margin=0.2, resample=Image.Resampling.BILINEAR):
+        """
+        Recorta (y endereza) el rostro y lo redimensiona a output_size
+
+        Si face es None se usa el mayor cuadrado centrado de la imagen.
+
+        Args:
+            pil_image: Imagen PIL
+            face: Resultado de detect
+            output_size: tuple (width, height)
+            margin: Margen alrededor del rostro, como fraccion de su tamaño
+            resample: Filtro de PIL
+
+        Returns:
+            PIL Image de tamaño output_size
+        """
+        width, height = pil_image.size
+        if face is None:
+            side = min(width, height)
+            left, top = (width - side) / 2, (height - side) / 2
+            return pil_image.resize(output_size, resample, box=(left, top, left + side, top + side))
+        x, y, w, h = face["box"]
+        x, y, w, h = x * width, y * height, w * width, h * height
+        center = (x + w / 2, y + h / 2)
+        if face["angle"]:
+            pil_image = pil_image.rotate(face["angle"], resample=Image.Resampling.BILINEAR, center=center)
+        side = max(w, h) * (1 + 2 * margin)
+        left, top = center[0] - side / 2, center[1] - side / 2
+        return pil_image.resize(output_size, resample, box=(
+            max(0.0, left), max(0.0, top), min(width, left + side), min(height, top + side)
+        ))
@@ -0,0 +1,241 @@
+import json
+import os
+import numpy as np
+
+class FeatureStore:
+    """
+    Almacen en disco de vectores de pixeles preprocesados
+
+    Estructura del directorio:
+        features.bin   matriz (N, feature_size) en uint8, sin cabecera
+        labels.npy     etiquetas (N,)
+        manifest.json  version, forma de la matriz, archivos, parametros y,
+                       por archivo, hash/mtime/tamaño (ver ImageProcessor.update_feature_store)
+
+    La matriz se lee con np.memmap, por lo que abrir el almacen no carga
+    nada en memoria; solo los lotes que se consumen se convierten a float.
+    """
+
+    VERSION = 1
+    FEATURES_FILE = "features.bin"
+    LABELS_FILE = "labels.npy"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, self.MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] != self.VERSION:
+            raise ValueError(f"Version de almacen no soportada: {self.manifest['version']}")
+        self.manifest.setdefault("entries", {})
+        self._features = None
+        self._labels = None
+        self._truncate_orphans()
+
+    @classmethod
+    def create(cls, directory, feature_size, params=None):
+        """
+        Crea un almacen vacio (sobrescribe uno existente en el directorio)
+
+        Args:
+            directory: Directorio del almacen
+            feature_size: Numero de pixeles por imagen
+            params: Parametros de preprocesamiento usados (se guardan en el manifiesto)
+
+        Returns:
+            FeatureStore vacio
+        """
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, cls.FEATURES_FILE), "wb").close()
+        np.save(os.path.join(directory, cls.LABELS_FILE), np.zeros(0, dtype=np.int32))
+        manifest = {
+            "version": cls.VERSION,
+            "dtype": "uint8",
+            "feature_size": int(feature_size),
+            "count": 0,
+            "files": [],
+            "entries": {},
+            "params": params or {},
+        }
+        cls._write_manifest(directory, manifest)
+        return cls(directory)
+
+    @classmethod
+    def _write_manifest(cls, directory, manifest):
+        path = os.path.join(directory, cls.MANIFEST_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def _truncate_orphans(self):
+        """
+        Quita filas de features.bin que el manifiesto no registra
+
+        append escribe los pixeles antes de actualizar el manifiesto; si se
+        interrumpe entre ambos pasos quedan filas huerfanas al final y el
+        siguiente append escribiria en un desplazamiento equivocado.
+        """
+        path = os.path.join(self.directory, self.FEATURES_FILE)
+        expected = len(self) * self.feature_size
+        if os.path.getsize(path) > expected:
+            with open(path, "r+b") as f:
+                f.truncate(expected)
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    @property
+    def feature_size(self):
+        return self.manifest["feature_size"]
+
+    @property
+    def files(self):
+        return self.manifest["files"]
+
+    @property
+    def features(self):
+        """Matriz (N, feature_size) en uint8 mapeada en memoria (solo lectura)"""
+        if self._features is None:
+            if len(self) == 0:
+                return np.zeros((0, self.feature_size), dtype=np.uint8)
+            self._features = np.memmap(
+                os.path.join(self.directory, self.FEATURES_FILE),
+                dtype=np.uint8, mode="r", shape=(len(self), self.feature_size)
+            )
+        return self._features
+
+    @property
+    def labels(self):
+        if self._labels is None:
+            self._labels = np.load(os.path.join(self.directory, self.LABELS_FILE))
+        return self._labels
+
+    def append(self, records, entries=None):
+        """
+        Agrega registros al final del almacen
+
+        Args:
+            records: Iterable de (file, raw_vector, tag) con raw_vector en uint8
+            entries: dict opcional file -> metadatos del archivo (hash, mtime...)
+
+        Returns:
+            count: Numero de registros agregados
+        """
+        files = []
+        labels = []
+        new_entries = {}
+        self._truncate_orphans()
+        try:
+            with open(os.path.join(self.directory, self.FEATURES_FILE), "ab") as f:
+                for file, raw_vector, tag in records:
+                    raw_vector = np.asarray(raw_vector, dtype=np.uint8).ravel()
+                    if raw_vector.size != self.feature_size:
+                        raise ValueError(
+                            f"{file}: se esperaban {self.feature_size} pixeles, hay {raw_vector.size}"
+                        )
+                    f.write(raw_vector.tobytes())
+                    files.append(file)
+                    labels.append(tag)
+                    if entries is not None and file in entries:
+                        new_entries[file] = entries[file]
+            self.manifest["entries"].update(new_entries)
+            self._commit(self.files + files, np.concatenate([self.labels, np.asarray(labels, dtype=np.int32)]))
+        except BaseException:
+            # Ctrl-C o un error del etiquetador/decodificador: se descartan
+            # las filas escritas sin registrar en el manifiesto
+            self._truncate_orphans()
+            raise
+        return len(files)
+
+    def remove(self, files, chunk_rows=256):
+        """
+        Elimina del almacen las filas de los archivos indicados
+
+        Las filas que se conservan se desplazan hacia el inicio dentro del mismo
+        archivo (por bloques, sin cargar la matriz completa) y luego se trunca.
+
+        Args:
+            files: Iterable de nombres de archivo a eliminar
+            chunk_rows: Filas copiadas por bloque
+
+        Returns:
+            count: Numero de filas eliminadas
+        """
+        files = set(files)
+        keep = np.array([file not in files for file in self.files], dtype=bool)
+        removed = int(len(keep) - keep.sum())
+        if removed == 0:
+            return 0
+        kept_rows = np.flatnonzero(keep)
+        path = os.path.join(self.directory, self.FEATURES_FILE)
+        self._features = None
+        if len(kept_rows) > 0:
+            matrix = np.memmap(path, dtype=np.uint8, mode="r+", shape=(len(self), self.feature_size))
+            # la fila destino siempre es <= a la de origen, copiar en orden es seguro
+            for start in range(0, len(kept_rows), chunk_rows):
+                rows = kept_rows[start:start + chunk_rows]
+                matrix[start:start + len(rows)] = matrix[rows]
+            matrix.flush()
+            del matrix
+        with open(path, "r+b") as f:
+            f.truncate(len(kept_rows) * self.feature_size)
+        for file in files:
+            self.manifest["entries"].pop(file, None)
+        self._commit([self.files[i] for i in kept_rows], self.labels[keep])
+        return removed
+
+    def relabel(self, labeler):
+        """
+        Recalcula las etiquetas con labeler (no toca la matriz de pixeles)
+        """
+        labels = np.asarray([labeler(file) for file in self.files], dtype=np.int32)
+        self._commit(list(self.files), labels)
+
+    def _commit(self, files, labels):
+        np.save(os.path.join(self.directory, self.LABELS_FILE), labels)
+        self.manifest["files"] = files
+        self.manifest["count"] = len(files)
+        self._write_manifest(self.directory, self.manifest)
+        self._features = None
+        self._labels = None
+
+    def get_batch(self, indices, dtype=np.float32, scale=1 / 255.0):
+        """
+        Convierte a float solo las filas pedidas
+
+        Args:
+            indices: Indices (o slice) de las filas
+            dtype: Tipo de dato de salida
+            scale: Factor de escala (por defecto lleva los pixeles a [0, 1])
+
+        Returns:
+            (x, y): Matriz de entrada y vector de etiquetas
+        """
+        if not isinstance(indices, slice):
+            indices = np.sort(np.asarray(indices))
+        x = np.multiply(self.features[indices], scale, dtype=dtype)
+        return x, self.labels[indices]
+
+    def iter_batches(self, batch_size, indices=None, shuffle=False, seed=None,
+                     dtype=np.float32, scale=1 / 255.0):
+        """
+        Recorre el almacen por lotes
+
+        Args:
+            batch_size: Tamaño de cada lote
+            indices: Subconjunto de filas a recorrer (por defecto todas)
+            shuffle: Si se barajan las filas antes de recorrerlas
+            seed: Semilla para el barajado
+            dtype, scale: Ver get_batch
+
+        Yields:
+            (x, y) por lote
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        indices = np.asarray(indices)
+        if shuffle:
+            indices = np.random.default_rng(seed).permutation(indices)
+        for start in range(0, len(indices), batch_size):
+            yield self.get_batch(indices[start:start + batch_size], dtype, scale)
@@ -1,34 +1,454 @@
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import hashlib
+import io
+import json
 import os
+import sys
+import threading
+import time
 import numpy as np
+from .FeatureStore import FeatureStore
+from .FaceDetector import DEFAULT_CASCADE, FaceDetector
+from .Profiler import Instrumented
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif", ".webp")
+
+# decodificadores disponibles (ver ImageProcessor.decode)
+DECODERS = ("pil", "draft", "cv2")
+RESIZE_STRATEGIES = ("direct", "pad", "crop")
+
+def find_images(directory, recursive=True):
+    """
+    Busca imagenes (por extension) dentro de un directorio
+
+    Args:
+        directory: Directorio a revisar
+        recursive: Si tambien se revisan los subdirectorios
+
+    Returns:
+        Lista ordenada de rutas completas
+    """
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, file))
+        if not recursive:
+            break
+    return paths
+
+def default_labeler(file_name):
+    """
+    Etiqueta por defecto: 1 si el nombre del archivo contiene "gerardo", 0 si no
+
+    Args:
+        file_name: Nombre del archivo (sin directorio)
+
+    Returns:
+        tag: 1 o 0
+    """
+    return 1 if "gerardo" in file_name else 0
+
+# ImageProcessor por hilo (el de cada proceso del pool o cada hilo de
+# decodificacion del servidor), reutilizado entre archivos: con face_crop
+# construir uno nuevo recarga las cascadas de OpenCV en cada imagen
+_thread_state = threading.local()
+
+def processor_for(params):
+    """ImageProcessor de este hilo para params (se crea la primera vez)"""
+    processors = getattr(_thread_state, "processors", None)
+    if processors is None:
+        processors = _thread_state.processors = {}
+    key = json.dumps(params, sort_keys=True)
+    processor = processors.get(key)
+    if processor is None:
+        processor = processors[key] = ImageProcessor.from_params(params)
+    return processor
+
+def _process_file(params, initial_image_path, new_image_path, processor=None, with_entry=False):
+    """
+    Procesa un archivo dentro de un proceso del pool
+
+    Devuelve el vector de pixeles en uint8 (4 veces mas pequeño que float32)
+    para que el envio entre procesos sea barato; la normalizacion se hace en
+    el proceso principal. Sin pool se pasa el processor actual (y sus ganchos).
+    Con with_entry devuelve (vector, entrada) con el hash, mtime y tamaño del
+    archivo (ver FeatureStore), calculados aqui al leerlo en lugar de en serie
+    en el proceso principal.
+    """
+    if processor is None:
+        processor = processor_for(params)
+    source = initial_image_path
+    if with_entry:
+        stat = os.stat(initial_image_path)
+        with open(initial_image_path, "rb") as f:
+            source = f.read()
+        entry = {"sha1": hashlib.sha1(source).hexdigest(), "mtime": stat.st_mtime, "size": stat.st_size}
+    pixel_array = processor.decode(source)
+    if new_image_path is not None:
+        Image.fromarray(pixel_array).save(new_image_path)
+    if with_entry:
+        return pixel_array.ravel(), entry
+    return pixel_array.ravel()
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Calcula el hash (sha1) del contenido de un archivo leyendolo por bloques
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cv2_interpolation(cv2, resample):
+    return {
+        Image.Resampling.NEAREST: cv2.INTER_NEAREST,
+        Image.Resampling.BILINEAR: cv2.INTER_LINEAR,
+        Image.Resampling.BICUBIC: cv2.INTER_CUBIC,
+        Image.Resampling.LANCZOS: cv2.INTER_LANCZOS4,
+    }.get(resample, cv2.INTER_AREA)
+
+def _image_nbytes(pil_image):
+    width, height = pil_image.size
+    return width * height * len(pil_image.getbands())
+
+class ImageProcessor(Instrumented):
+    # etapas medidas con add_hook: decode, resize, face_crop y vectorize
+    def __init__(self, target_size=(700, 600), resample=Image.Resampling.LANCZOS, grayscale=True,
+                 decoder="pil", strategy="direct", face_crop=False, face_margin=0.2, face_cascade=DEFAULT_CASCADE,
+                 face_cache_dir=None):
+        """
+        Args:
+            target_size: tuple (width, height) al que se redimensiona cada imagen
+            resample: Filtro de PIL (enum o nombre, p. ej. "LANCZOS"); BILINEAR
+                o BOX son bastante mas baratos
+            grayscale: Si es True la imagen se pasa a blanco y negro, si no a RGB
+            decoder: "pil" decodifica la imagen completa (comportamiento original),
+                "draft" usa Image.draft para que el JPEG se decodifique ya en
+                blanco y negro y reducido 2, 4 u 8 veces, y "cv2" hace lo mismo
+                con cv2.IMREAD_REDUCED_* (si OpenCV no esta instalado usa "draft")
+            strategy: "direct" estira la imagen a target_size (comportamiento
+                original), "pad" conserva el aspecto y rellena con negro y
+                "crop" conserva el aspecto y recorta desde el centro
+            face_crop: Si es True se detecta el rostro (FaceDetector) y solo se
+                conserva el rostro recortado y enderezado, redimensionado a
+                target_size (p. ej. 64x64 en vez de la imagen completa)
+            face_margin: Margen alrededor del rostro, como fraccion de su tamaño
+            face_cascade: Cascada de OpenCV para detectar el rostro
+            face_cache_dir: Directorio del cache de detecciones (no forma parte
+                de los parametros del modelo)
+        """
+        self.target_size = tuple(target_size)
+        if isinstance(resample, str):
+            resample = Image.Resampling[resample]
+        self.resample = Image.Resampling(resample)
+        self.grayscale = grayscale
+        if decoder not in DECODERS:
+            raise ValueError(f"Decodificador desconocido: {decoder} (opciones: {', '.join(DECODERS)})")
+        self.decoder = decoder
+        if strategy not in RESIZE_STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy} (opciones: {', '.join(RESIZE_STRATEGIES)})")
+        self.strategy = strategy
+        self.face_crop = face_crop
+        self.face_margin = face_margin
+        self.face_cascade = face_cascade
+        self.face_cache_dir = face_cache_dir
+        self._face_detector = None
+
+    def get_params(self):
+        """Parametros de preprocesamiento en un dict serializable a JSON"""
+        params = {
+            "target_size": list(self.target_size),
+            "resample": self.resample.name,
+            "grayscale": self.grayscale,
+            "decoder": self.decoder,
+        }
+        if self.strategy != "direct":
+            params["strategy"] = self.strategy
+        if self.face_crop:
+            params.update({
+                "face_crop": True,
+                "face_margin": self.face_margin,
+                "face_cascade": self.face_cascade,
+            })
+        return params
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(**params)
+
+    @property
+    def face_detector(self):
+        if self._face_detector is None:
+            self._face_detector = FaceDetector(self.face_cascade, cache_dir=self.face_cache_dir)
+        return self._face_detector
+
+    @property
+    def feature_size(self):
+        """Numero de valores del vector de cada imagen"""
+        width, height = self.target_size
+        return width * height * (1 if self.grayscale else 3)
+
+    def _layout(self, width, height):
+        """
+        Geometria de la estrategia para una imagen de width x height
+
+        Returns:
+            (box, inner_size, offset): region de la imagen original que se
+            usa, tamaño al que se redimensiona esa region y posicion donde
+            se pega dentro de target_size
+        """
+        target_width, target_height = self.target_size
+        box = (0, 0, width, height)
+        if self.strategy == "direct":
+            return box, self.target_size, (0, 0)
+        if self.strategy == "crop":
+            # region centrada con el aspecto de target_size
+            ratio = max(target_width / width, target_height / height)
+            crop_width, crop_height = target_width / ratio, target_height / ratio
+            left, top = max(0.0, (width - crop_width) / 2), max(0.0, (height - crop_height) / 2)
+            box = (left, top, min(width, left + crop_width), min(height, top + crop_height))
+            return box, self.target_size, (0, 0)
+        ratio = min(target_width / width, target_height / height)
+        inner_size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+        offset = ((target_width - inner_size[0]) // 2, (target_height - inner_size[1]) // 2)
+        return box, inner_size, offset
+
+    def _draft_size(self, width, height):
+        """Tamaño minimo al que se puede reducir la imagen al decodificarla"""
+        if self.strategy != "crop":
+            return self.target_size
+        target_width, target_height = self.target_size
+        ratio = max(target_width / width, target_height / height)
+        return (int(np.ceil(width * ratio)), int(np.ceil(height * ratio)))
+
+    def _resize(self, pil_image, mode):
+        box, inner_size, offset = self._layout(*pil_image.size)
+        resized_image = pil_image.resize(inner_size, self.resample, box=box)
+        if resized_image.mode != mode:
+            resized_image = resized_image.convert(mode)
+        if inner_size == self.target_size:
+            return resized_image
+        padded_image = Image.new(mode, self.target_size, 0)
+        padded_image.paste(resized_image, offset)
+        return padded_image
 
-class ImageProcessor:
-    def __init__(self):
-        pass
-    
     def resize_black_and_white(self, pil_image):
         """
-        Redimensiona la imagen a 700x600 pixeles y lo pasa a blanco y negro
+        Redimensiona la imagen a target_size (700x600 por defecto) segun
+        self.strategy y la pasa a blanco y negro (o a RGB)
         
         Args:
             pil_image: Imagen PIL original
             
         Returns:
-            PIL Image redimensionada a 700x600
+            PIL Image redimensionada a target_size
         """
         try:
-            image_copy = pil_image.copy()
-            resized_image = image_copy.resize((700, 600), Image.Resampling.LANCZOS)
-            grayscale_image = resized_image.convert("L")
-            # resized_image.show();
-            return grayscale_image
+            mode = "L" if self.grayscale else "RGB"
+            if self.face_crop:
+                return self.crop_face(pil_image)
+            hooks = self._hooks
+            if hooks:
+                start = time.perf_counter()
+            if self.decoder == "pil":
+                resized_image = self._resize(pil_image, mode)
+            else:
+                # en los modos rapidos se convierte primero: el filtro trabaja sobre un solo canal
+                resized_image = self._resize(pil_image.convert(mode), mode)
+            if hooks:
+                self._emit("resize", start, _image_nbytes(resized_image))
+            return resized_image
         except Exception as e:
-            print(f"Error al redimensionar imagen: {e}")
+            print(f"Error al redimensionar imagen: {e}", file=sys.stderr)
             return pil_image
     
+    def crop_face(self, pil_image, cache_key=None):
+        """
+        Detecta el rostro principal y devuelve solo el rostro, enderezado y
+        redimensionado a target_size
+
+        Args:
+            pil_image: Imagen PIL
+            cache_key: Hash del contenido de la imagen para el cache de detecciones
+
+        Returns:
+            PIL Image de tamaño target_size
+        """
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        mode = "L" if self.grayscale else "RGB"
+        image = pil_image.convert(mode)
+        gray = image if self.grayscale else image.convert("L")
+        face = self.face_detector.detect(np.asarray(gray), cache_key)
+        face_image = FaceDetector.crop(image, face, self.target_size, self.face_margin, self.resample)
+        if hooks:
+            self._emit("face_crop", start, _image_nbytes(face_image))
+        return face_image
+
+    def decode(self, source):
+        """
+        Decodifica y redimensiona una imagen segun self.decoder
+
+        Args:
+            source: Ruta del archivo, bytes o archivo abierto
+
+        Returns:
+            Arreglo uint8 (alto, ancho) o (alto, ancho, 3) de tamaño target_size
+        """
+        if self.face_crop:
+            return self._decode_face(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        if self.decoder == "cv2":
+            try:
+                import cv2
+            except ImportError:
+                cv2 = None
+            if cv2 is not None:
+                return self._decode_cv2(cv2, source)
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        with Image.open(source) as pil_image:
+            if self.decoder != "pil":
+                # solo tiene efecto en JPEG; elige la mayor reduccion que no
+                # baje de target_size
+                pil_image.draft("L" if self.grayscale else "RGB", self._draft_size(*pil_image.size))
+            if hooks:
+                # sin ganchos la decodificacion ocurre dentro de resize
+                pil_image.load()
+                self._emit("decode", start, _image_nbytes(pil_image))
+            resized_image = self.resize_black_and_white(pil_image)
+        return self._vectorize(resized_image)
+
+    def _vectorize(self, pil_image):
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        pixel_array = np.asarray(pil_image, dtype=np.uint8)
+        if hooks:
+            self._emit("vectorize", start, pixel_array.nbytes)
+        return pixel_array
+
+    def _decode_face(self, source):
+        # el hash del archivo solo sirve como llave del cache de detecciones:
+        # sin cache (Predictor, server.py) no se calcula
+        use_cache = self.face_detector.cache_dir is not None
+        cache_key = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            if use_cache:
+                cache_key = hashlib.sha1(source).hexdigest()
+            source = io.BytesIO(source)
+        elif isinstance(source, str) and use_cache:
+            cache_key = file_hash(source)
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        with Image.open(source) as pil_image:
+            if self.decoder != "pil":
+                # la deteccion no necesita la resolucion completa
+                size = self.face_detector.detection_size
+                pil_image.draft("L" if self.grayscale else "RGB", (size, size))
+            if hooks:
+                pil_image.load()
+                self._emit("decode", start, _image_nbytes(pil_image))
+            face_image = self.crop_face(pil_image, cache_key)
+        return self._vectorize(face_image)
+
+    def _decode_cv2(self, cv2, source):
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                data = f.read()
+        else:
+            data = source.read()
+        # el encabezado se lee con PIL (sin decodificar) para elegir la reduccion
+        with Image.open(io.BytesIO(data)) as pil_image:
+            width, height = pil_image.size
+        target_width, target_height = self._draft_size(width, height)
+        factor = 1
+        for candidate in (8, 4, 2):
+            if width // candidate >= target_width and height // candidate >= target_height:
+                factor = candidate
+                break
+        if self.grayscale:
+            flags = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+                     4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}[factor]
+        else:
+            flags = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                     4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}[factor]
+        # PIL no aplica la orientacion EXIF, asi que cv2 tampoco debe hacerlo
+        flags |= cv2.IMREAD_IGNORE_ORIENTATION
+        pixel_array = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+        if pixel_array is None:
+            raise ValueError("OpenCV no pudo decodificar la imagen")
+        if not self.grayscale:
+            pixel_array = cv2.cvtColor(pixel_array, cv2.COLOR_BGR2RGB)
+        if hooks:
+            self._emit("decode", start, pixel_array.nbytes)
+            start = time.perf_counter()
+        (left, top, right, bottom), inner_size, (x, y) = self._layout(pixel_array.shape[1], pixel_array.shape[0])
+        if self.strategy == "crop":
+            pixel_array = pixel_array[int(top):int(round(bottom)), int(left):int(round(right))]
+        interpolation = _cv2_interpolation(cv2, self.resample)
+        if inner_size == self.target_size:
+            resized = cv2.resize(pixel_array, self.target_size, interpolation=interpolation)
+        else:
+            target_width, target_height = self.target_size
+            resized = np.zeros((target_height, target_width) + pixel_array.shape[2:], dtype=np.uint8)
+            # cv2 escribe directamente dentro del lienzo con relleno
+            cv2.resize(pixel_array, inner_size, dst=resized[y:y + inner_size[1], x:x + inner_size[0]],
+                       interpolation=interpolation)
+        if hooks:
+            self._emit("resize", start, resized.nbytes)
+        return resized
+
+    def process_batch(self, sources, out=None, dtype=np.uint8, scale=1.0 / 255.0):
+        """
+        Preprocesa varias imagenes dentro de una sola matriz
+
+        Args:
+            sources: Imagenes PIL, rutas o bytes
+            out: Matriz (N, feature_size) opcional donde escribir; se reutiliza
+                entre llamadas para no reservar memoria en cada lote
+            dtype: uint8 (la red escala por 1/255) o un tipo flotante
+            scale: Factor aplicado cuando dtype es flotante
+
+        Returns:
+            Matriz (N, feature_size); cada fila es el vector de una imagen
+        """
+        sources = list(sources)
+        if out is None:
+            out = np.empty((len(sources), self.feature_size), dtype=dtype)
+        elif out.shape[0] < len(sources) or out.shape[1] != self.feature_size:
+            raise ValueError(f"out debe tener forma ({len(sources)}, {self.feature_size}), tiene {out.shape}")
+        out = out[:len(sources)]
+        for row, source in zip(out, sources):
+            if isinstance(source, Image.Image):
+                row[:] = self._vectorize(self.resize_black_and_white(source)).ravel()
+            else:
+                row[:] = self.decode(source).ravel()
+        if out.dtype != np.uint8:
+            out *= scale
+        return out
+
     def image_to_vector(self,pil_image):
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
         img_array = np.array(pil_image) / 255.0
-        return img_array.flatten() 
+        img_array = img_array.flatten()
+        if hooks:
+            self._emit("vectorize", start, img_array.nbytes)
+        return img_array
     
     def map_matrix_values(self,pixel_matrix):
         """
@@ -43,49 +463,249 @@ class ImageProcessor:
         zero_one_pixel_matrix = (pixel_matrix == 255).astype(np.uint8)
         return zero_one_pixel_matrix
     
-    def batch_processing(self,source_directory,destination_directory):
-        content = os.listdir(source_directory)
-        counter = 0
+    def list_images(self, source_directory):
+        """
+        Lista (ordenados) los archivos de imagen de un directorio (por
+        extension, ver IMAGE_EXTENSIONS), ignorando subdirectorios
+
+        Asi un archivo que no es imagen (p. ej. notas.txt) no se lee, ni se
+        hashea, ni vuelve a fallar en cada update_feature_store.
+        """
+        return sorted(
+            file for file in os.listdir(source_directory)
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+            and os.path.isfile(os.path.join(source_directory, file))
+        )
+
+    def iter_processing(self, source_directory, destination_directory=None,
+                        labeler=default_labeler, workers=1, normalize=True,
+                        max_pending=None, files=None, entries=None, cancel_event=None):
+        """
+        Procesa las imagenes de un directorio y entrega los resultados uno a uno
+
+        Args:
+            source_directory: Directorio con las imagenes originales (None si
+                files contiene rutas completas)
+            destination_directory: Directorio donde guardar las imagenes
+                redimensionadas (None para no guardarlas)
+            labeler: Funcion que recibe el nombre del archivo y devuelve su etiqueta
+            workers: Numero de procesos; 1 procesa en el proceso actual y
+                None usa todos los nucleos
+            normalize: Si es True el vector se entrega en float64 entre 0 y 1,
+                si es False se entrega en uint8 sin escalar
+            max_pending: Maximo de imagenes en vuelo en el pool (por defecto
+                4 por proceso), limita la memoria usada
+            files: Lista de archivos a procesar (por defecto todo el directorio)
+            entries: dict opcional; por cada archivo procesado se guarda
+                entries[file] = {"sha1", "mtime", "size"} antes de entregarlo
+            cancel_event: threading.Event opcional; si se activa se deja de
+                procesar despues de la imagen en curso y se cancelan las
+                decodificaciones pendientes del pool
+
+        Yields:
+            (file, pixel_vector, tag)
+        """
+        if files is None:
+            files = self.list_images(source_directory)
+        params = self.get_params()
+        if self.face_cache_dir is not None:
+            params["face_cache_dir"] = self.face_cache_dir
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        def paths(file):
+            new_image_path = None
+            if destination_directory is not None:
+                new_image_path = os.path.join(destination_directory, os.path.basename(file))
+            if source_directory is None:
+                return params, file, new_image_path
+            return params, os.path.join(source_directory, file), new_image_path
+
+        with_entry = entries is not None
+
+        def finish(file, raw_vector):
+            if with_entry:
+                raw_vector, entries[file] = raw_vector
+            pixel_vector = raw_vector / 255.0 if normalize else raw_vector
+            return file, pixel_vector, labeler(file)
+
+        def cancelled():
+            return cancel_event is not None and cancel_event.is_set()
+
+        if workers <= 1:
+            for file in files:
+                if cancelled():
+                    return
+                try:
+                    raw_vector = _process_file(*paths(file), processor=self, with_entry=with_entry)
+                except Exception as e:
+                    print(f"Error al procesar {file}: {e}", file=sys.stderr)
+                    continue
+                yield finish(file, raw_vector)
+            return
+
+        if max_pending is None:
+            max_pending = 4 * workers
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = deque()
+            file_iter = iter(files)
+            for file in file_iter:
+                pending.append((file, executor.submit(_process_file, *paths(file), with_entry=with_entry)))
+                if len(pending) >= max_pending:
+                    break
+            while pending:
+                if cancelled():
+                    return
+                file, future = pending.popleft()
+                next_file = next(file_iter, None)
+                if next_file is not None:
+                    pending.append((next_file, executor.submit(
+                        _process_file, *paths(next_file), with_entry=with_entry)))
+                try:
+                    raw_vector = future.result()
+                except Exception as e:
+                    print(f"Error al procesar {file}: {e}", file=sys.stderr)
+                    continue
+                yield finish(file, raw_vector)
+        finally:
+            # al cancelar (o cerrar el generador antes de terminar) no se
+            # espera a las decodificaciones en cola, solo a las que ya corren
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def batch_processing(self, source_directory, destination_directory=None,
+                         labeler=default_labeler, workers=1):
+        """
+        Procesa todas las imagenes de un directorio y devuelve el dataset completo
+
+        Args:
+            source_directory: Directorio con las imagenes originales
+            destination_directory: Directorio donde guardar las imagenes
+                redimensionadas (None para no guardarlas)
+            labeler: Funcion que recibe el nombre del archivo y devuelve su etiqueta
+            workers: Numero de procesos (ver iter_processing)
+
+        Returns:
+            dataset: Lista de tuplas (pixel_vector, tag)
+        """
         dataset = []
-        for file in content:
-            initial_image_path = source_directory + file
-            newImage = Image.open(initial_image_path)
-            resized_image = self.resize_black_and_white(newImage)
-            new_image_path = destination_directory + file
-            pixel_vector = self.image_to_vector(resized_image)
-            # pixel_vector = self.map_matrix_values(pixel_vector)
-            tag = 0
-            if ("gerardo" in file):
-                tag = 1
-            dataset.append((pixel_vector,tag))
-            resized_image.save(new_image_path)
-            counter += 1
-        print(f"Se insertaron {counter} imagenes")
+        for file, pixel_vector, tag in self.iter_processing(
+                source_directory, destination_directory, labeler, workers):
+            dataset.append((pixel_vector, tag))
+        print(f"Se insertaron {len(dataset)} imagenes")
         return dataset
 
-def quick_test():
+    def build_feature_store(self, source_directory, store_directory,
+                            labeler=default_labeler, workers=1):
+        """
+        Procesa un directorio y guarda los vectores en un FeatureStore en uint8
+
+        A diferencia de batch_processing no guarda el dataset en memoria: cada
+        imagen se escribe al disco apenas sale del pool.
+
+        Args:
+            source_directory: Directorio con las imagenes originales
+            store_directory: Directorio donde se crea el almacen
+            labeler: Funcion que recibe el nombre del archivo y devuelve su etiqueta
+            workers: Numero de procesos (ver iter_processing)
+
+        Returns:
+            FeatureStore con las imagenes procesadas
+        """
+        # el hash de cada archivo se calcula en el pool al leerlo (ver _process_file)
+        entries = {}
+        store = FeatureStore.create(store_directory, self.feature_size, params=self.get_params())
+        counter = store.append(self.iter_processing(
+            source_directory, None, labeler, workers, normalize=False, entries=entries), entries)
+        print(f"Se insertaron {counter} imagenes")
+        return store
+
+    def _file_entry(self, source_directory, file, stat=None):
+        path = os.path.join(source_directory, file)
+        if stat is None:
+            stat = os.stat(path)
+        return {"sha1": file_hash(path), "mtime": stat.st_mtime, "size": stat.st_size}
+
+    def update_feature_store(self, source_directory, store_directory,
+                             labeler=default_labeler, workers=1):
+        """
+        Actualiza un FeatureStore procesando solo las imagenes nuevas o modificadas
+
+        Cada fila del almacen guarda el hash, mtime y tamaño de su archivo. Un
+        archivo cuyo mtime y tamaño no cambiaron se da por igual sin leerlo; si
+        cambiaron se compara el hash del contenido. Las imagenes que ya no estan
+        en el directorio (o que cambiaron) se eliminan del almacen, y las nuevas
+        se agregan al final. Si los parametros de preprocesamiento no coinciden
+        con los del almacen se reconstruye completo.
+
+        Args:
+            source_directory: Directorio con las imagenes originales
+            store_directory: Directorio del almacen
+            labeler: Funcion que recibe el nombre del archivo y devuelve su etiqueta
+            workers: Numero de procesos (ver iter_processing)
+
+        Returns:
+            FeatureStore actualizado
+        """
+        try:
+            store = FeatureStore(store_directory)
+        except (FileNotFoundError, ValueError):
+            store = None
+        if store is None or store.manifest["params"] != self.get_params():
+            return self.build_feature_store(source_directory, store_directory, labeler, workers)
+
+        entries = store.manifest["entries"]
+        files = self.list_images(source_directory)
+        stored = set(store.files)
+        stale = stored - set(files)
+        pending = []
+        for file in files:
+            path = os.path.join(source_directory, file)
+            stat = os.stat(path)
+            entry = entries.get(file)
+            if entry is not None:
+                if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                    continue
+                new_entry = self._file_entry(source_directory, file, stat)
+                if entry["sha1"] == new_entry["sha1"]:
+                    # solo cambio el mtime (p. ej. se copio el archivo)
+                    entry.update(new_entry)
+                    continue
+            if file in stored:
+                stale.add(file)
+            # los archivos nuevos se hashean en el pool al procesarlos
+            pending.append(file)
+
+        removed = store.remove(stale)
+        store.relabel(labeler)
+        new_entries = {}
+        added = store.append(self.iter_processing(
+            source_directory, None, labeler, workers, normalize=False,
+            files=pending, entries=new_entries), new_entries)
+        print(f"Se insertaron {added} imagenes y se eliminaron {removed}")
+        return store
+
+def quick_test(source_directory, destination_directory=None):
+    """
+    Prueba rápida: procesa un directorio y muestra el tamaño del dataset
+
+    Uso: python -m neuralNetwork.utilities.ImageProcessor ORIGEN [DESTINO]
+    """
     print("Prueba rápida de ImageProcessor")
     
-    test_image = Image.open('images/objetivo/2.jpg')
-    print(f"Dimensiones originales: {test_image.size}")
-    
     processor = ImageProcessor()
-    my_image_dataset = processor.batch_processing('/home/gasallinas/Documents/Clases/IA/finalProject/images/objetivo/','/home/gasallinas/Documents/Clases/IA/finalProject/images/black_white_images/',1)
-    # other_image_dataset = processor.batch_processing('/home/gasallinas/Documents/Clases/IA/finalProject/images/otro/','/home/gasallinas/Documents/Clases/IA/finalProject/images/black_white_images/',0)
-    # full_image_dataset = []
-    # full_image_dataset.append(my_image_dataset)
-    # full_image_dataset.append(other_image_dataset)
-    # result = processor.resize_black_and_white(test_image)
-    # image_pixel_matrix = processor.image_to_list(result)
-    # pixel_matrix = processor.map_matrix_values(image_pixel_matrix)
-    # print(pixel_matrix)
+    files = processor.list_images(source_directory)
+    if files:
+        with Image.open(os.path.join(source_directory, files[0])) as test_image:
+            print(f"Dimensiones originales: {test_image.size}")
     
-    # if result:
-    #     print(f"Dimensiones actuales: {result.size}")
-    #     result.save("/home/gasallinas/Documents/Clases/IA/finalProject/images/black_white_images/test_resized_grayscale.jpg")
-    #     print("Imagen guardada como 'test_resized.jpg'")
-    # else:
-    #     print("Error: No se pudo redimensionar la imagen")
+    dataset = processor.batch_processing(source_directory, destination_directory)
+    if dataset:
+        print(f"Dimensiones del vector: {dataset[0][0].shape}")
+        print(f"Imagenes con etiqueta 1: {sum(tag for _, tag in dataset)}")
 
 if __name__ == "__main__":
-    quick_test()
\ No newline at end of file
+    if len(sys.argv) < 2:
+        print(quick_test.__doc__)
+        sys.exit(1)
+    quick_test(*sys.argv[1:3])
\ No newline at end of file
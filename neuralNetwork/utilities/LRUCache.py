@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# Cache en memoria acotado por bytes (y opcionalmente por numero de
+# entradas). Lo usa la interfaz para no repetir la miniatura, el
+# preprocesamiento y la prediccion de una imagen que ya se vio; las llaves
+# de archivo incluyen mtime y tamaño, asi un archivo modificado nunca
+# devuelve datos viejos (sus entradas anteriores salen por antiguedad).
+
+# memoria aproximada de la llave y del nodo del diccionario
+ENTRY_OVERHEAD = 200
+
+def file_key(path):
+    """
+    Llave de un archivo: ruta absoluta, mtime (ns) y tamaño
+
+    Raises:
+        OSError si el archivo no existe
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+def estimate_size(value):
+    """Bytes aproximados de arreglos numpy, imagenes PIL y tuplas de ellos"""
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    if hasattr(value, "getbands") and hasattr(value, "size"):
+        width, height = value.size
+        return width * height * len(value.getbands())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+class LRUCache:
+    """
+    Cache LRU con expulsion por memoria; se puede usar desde varios hilos
+    """
+
+    def __init__(self, max_bytes=256 * 2**20, max_entries=None, sizeof=estimate_size):
+        """
+        Args:
+            max_bytes: Memoria maxima (aproximada) de los valores guardados
+            max_entries: Numero maximo de entradas (None sin limite)
+            sizeof: Funcion que estima los bytes de un valor
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Devuelve el valor (y lo marca como el mas reciente) o default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """
+        Guarda value y expulsa las entradas menos recientes que no quepan
+
+        Un valor mas grande que max_bytes no se guarda.
+        """
+        if nbytes is None:
+            nbytes = self.sizeof(value)
+        nbytes += ENTRY_OVERHEAD
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes or (
+                    self.max_entries is not None and len(self._entries) > self.max_entries):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Devuelve el valor guardado o lo calcula con compute() y lo guarda
+
+        compute se llama fuera del candado: dos hilos pueden calcular el
+        mismo valor a la vez, pero ninguno bloquea al otro mientras tanto.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self.nbytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """dict con entradas, bytes, aciertos, fallos y expulsiones"""
+        with self._lock:
+            return {
+                "entries": len(self._entries), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+            }
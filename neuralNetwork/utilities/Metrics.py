@@ -0,0 +1,101 @@
+import numpy as np
+
+# Metricas de clasificacion binaria vectorizadas con NumPy (sin bucles por muestra)
+
+def confusion_matrix(y_true, y_pred):
+    """
+    Args:
+        y_true: Etiquetas reales (0 o 1)
+        y_pred: Etiquetas predichas (0 o 1)
+
+    Returns:
+        Matriz 2x2 [[TN, FP], [FN, TP]]
+    """
+    y_true = np.asarray(y_true).ravel().astype(np.int64)
+    y_pred = np.asarray(y_pred).ravel().astype(np.int64)
+    return np.bincount(2 * y_true + y_pred, minlength=4).reshape(2, 2)
+
+def precision_recall(matrix):
+    """
+    Args:
+        matrix: Matriz de confusion de confusion_matrix
+
+    Returns:
+        (precision, recall, f1); 0 cuando el denominador es 0
+    """
+    (tn, fp), (fn, tp) = matrix
+    precision = tp / (tp + fp) if tp + fp > 0 else 0.0
+    recall = tp / (tp + fn) if tp + fn > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+    return float(precision), float(recall), float(f1)
+
+def roc_curve(y_true, scores):
+    """
+    Curva ROC evaluada en cada valor distinto de score
+
+    Args:
+        y_true: Etiquetas reales (0 o 1)
+        scores: Probabilidades predichas
+
+    Returns:
+        (fpr, tpr, thresholds); si falta una de las clases su tasa no esta
+        definida y queda en nan (tambien con entradas vacias)
+    """
+    y_true = np.asarray(y_true).ravel()
+    scores = np.asarray(scores).ravel()
+    if len(scores) == 0:
+        return np.array([np.nan]), np.array([np.nan]), np.array([np.inf])
+    order = np.argsort(scores, kind="mergesort")[::-1]
+    scores = scores[order]
+    y_true = y_true[order]
+    # ultimo indice de cada grupo de scores iguales
+    distinct = np.flatnonzero(np.diff(scores))
+    last = np.r_[distinct, len(scores) - 1]
+    tps = np.cumsum(y_true)[last]
+    fps = (last + 1) - tps
+    positives = tps[-1]
+    negatives = fps[-1]
+    tpr = np.r_[0.0, tps / positives] if positives > 0 else np.full(len(last) + 1, np.nan)
+    fpr = np.r_[0.0, fps / negatives] if negatives > 0 else np.full(len(last) + 1, np.nan)
+    thresholds = np.r_[np.inf, scores[last]]
+    return fpr, tpr, thresholds
+
+def auc(fpr, tpr):
+    """
+    Area bajo la curva por la regla del trapecio
+
+    nan si la curva no esta definida (una sola clase o sin muestras)
+    """
+    fpr = np.asarray(fpr)
+    tpr = np.asarray(tpr)
+    if len(fpr) < 2:
+        return float("nan")
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+def binary_report(y_true, scores, threshold=0.5):
+    """
+    Todas las metricas de una vez
+
+    Args:
+        y_true: Etiquetas reales (0 o 1)
+        scores: Probabilidades predichas
+        threshold: Umbral de decision
+
+    Returns:
+        dict con accuracy, precision, recall, f1, auc, confusion_matrix y roc;
+        auc es nan si y_true tiene una sola clase
+    """
+    y_true = np.asarray(y_true).ravel()
+    scores = np.asarray(scores).ravel()
+    matrix = confusion_matrix(y_true, scores > threshold)
+    precision, recall, f1 = precision_recall(matrix)
+    fpr, tpr, thresholds = roc_curve(y_true, scores)
+    return {
+        "accuracy": float(np.trace(matrix) / max(len(y_true), 1)),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "auc": auc(fpr, tpr),
+        "confusion_matrix": matrix,
+        "roc": (fpr, tpr, thresholds),
+    }
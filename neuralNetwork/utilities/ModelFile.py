@@ -0,0 +1,94 @@
+import json
+import os
+import struct
+import numpy as np
+
+# Formato de archivo de modelo (un solo archivo):
+#   MAGIC (8 bytes) | version (uint32) | largo del encabezado (uint64)
+#   encabezado JSON: {"metadata": {...}, "arrays": {nombre: {dtype, shape, offset}}}
+#   seccion de datos, alineada a ALIGNMENT bytes: arreglos en bruto (orden C),
+#   cada uno alineado a ALIGNMENT; offset es relativo al inicio de esta seccion
+# Como los arreglos quedan en bruto y alineados se cargan con np.memmap sin
+# deserializar nada: abrir un modelo de cientos de MB es casi instantaneo.
+
+MAGIC = b"PIDNNMDL"
+# 1: solo pesos; 2: sesgos (biases_{i}) y capas configurables; 3: proyeccion
+# de entrada opcional (projection_*). Un lector anterior rechaza los archivos
+# nuevos en vez de ignorar los sesgos o la proyeccion
+FORMAT_VERSION = 3
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sIQ")
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def save_model(path, arrays, metadata):
+    """
+    Guarda arreglos y metadatos en un archivo de modelo
+
+    Args:
+        path: Ruta del archivo
+        arrays: dict nombre -> np.ndarray
+        metadata: dict serializable a JSON (capas, dtype, preprocesamiento, umbral...)
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps({"metadata": metadata, "arrays": layout}).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+def read_header(path):
+    """
+    Lee solo el encabezado de un archivo de modelo
+
+    Returns:
+        (header, data_start)
+    """
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es un archivo de modelo")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Version de modelo no soportada: {version} (maxima {FORMAT_VERSION})")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    header["format_version"] = version
+    return header, _align(_PREFIX.size + header_len)
+
+def load_model(path, mmap_mode="c"):
+    """
+    Carga un archivo de modelo
+
+    Args:
+        path: Ruta del archivo
+        mmap_mode: Modo de np.memmap ("r" solo lectura, "c" copia al escribir,
+            util si se quiere seguir entrenando) o None para leer todo a memoria
+
+    Returns:
+        (arrays, metadata)
+    """
+    header, data_start = read_header(path)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        offset = data_start + entry["offset"]
+        if mmap_mode is None:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+    return arrays, header["metadata"]
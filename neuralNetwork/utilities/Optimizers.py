@@ -0,0 +1,204 @@
+import math
+import numpy as np
+
+# Optimizadores para NeuralNetwork. El estado (velocidades, momentos) se
+# reserva una sola vez con la forma de cada matriz de pesos y los pesos se
+# actualizan en su lugar; los calculos intermedios usan un buffer auxiliar
+# por matriz, asi un paso de entrenamiento no reserva memoria.
+
+class ConstantSchedule:
+    """Tasa de aprendizaje fija"""
+
+    def __call__(self, learning_rate, epoch):
+        return learning_rate
+
+class StepSchedule:
+    """Multiplica la tasa por factor cada step_size epocas"""
+
+    def __init__(self, step_size=30, factor=0.5):
+        self.step_size = step_size
+        self.factor = factor
+
+    def __call__(self, learning_rate, epoch):
+        return learning_rate * self.factor ** (epoch // self.step_size)
+
+class ExponentialSchedule:
+    """learning_rate * decay^epoch"""
+
+    def __init__(self, decay=0.97):
+        self.decay = decay
+
+    def __call__(self, learning_rate, epoch):
+        return learning_rate * self.decay ** epoch
+
+class CosineSchedule:
+    """Baja de learning_rate a min_rate siguiendo medio coseno en total_epochs"""
+
+    def __init__(self, total_epochs, min_rate=0.0):
+        self.total_epochs = total_epochs
+        self.min_rate = min_rate
+
+    def __call__(self, learning_rate, epoch):
+        progress = min(epoch / max(self.total_epochs, 1), 1.0)
+        return self.min_rate + (learning_rate - self.min_rate) * (1 + math.cos(math.pi * progress)) / 2
+
+class Optimizer:
+    def __init__(self, learning_rate=0.01, weight_decay=0.0, schedule=None):
+        """
+        Args:
+            learning_rate: Tasa de aprendizaje inicial
+            weight_decay: Decaimiento de los pesos (L2); 0 para desactivarlo
+            schedule: Funcion (learning_rate, epoca) -> tasa de esa epoca;
+                por defecto constante
+        """
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.schedule = schedule if schedule is not None else ConstantSchedule()
+        self.current_rate = learning_rate
+        self.iterations = 0
+        self._shapes = None
+
+    def _bind(self, weights):
+        """Reserva el estado la primera vez (o si cambia la arquitectura)"""
+        shapes = [(w.shape, w.dtype) for w in weights]
+        if shapes == self._shapes:
+            return
+        self._shapes = shapes
+        self.iterations = 0
+        self._scratch = [np.zeros_like(w) for w in weights]
+        self._init_state(weights)
+
+    def _init_state(self, weights):
+        pass
+
+    def start_epoch(self, epoch):
+        self.current_rate = self.schedule(self.learning_rate, epoch)
+
+    def step(self, weights, gradients):
+        """
+        Actualiza weights en su lugar
+
+        Args:
+            weights: Lista de matrices de pesos
+            gradients: Lista de gradientes con las mismas formas
+        """
+        self._bind(weights)
+        self.iterations += 1
+        for i, (w, g) in enumerate(zip(weights, gradients)):
+            self._update(i, w, g, self._scratch[i], w.dtype.type(self.current_rate))
+
+    def _update(self, i, w, g, scratch, rate):
+        raise NotImplementedError
+
+    def _decay(self, w, rate):
+        if self.weight_decay:
+            w *= w.dtype.type(1 - rate * self.weight_decay)
+
+class SGD(Optimizer):
+    """Descenso de gradiente, con momentum opcional"""
+
+    def __init__(self, learning_rate=0.01, momentum=0.0, nesterov=False, weight_decay=0.0, schedule=None):
+        super().__init__(learning_rate, weight_decay, schedule)
+        self.momentum = momentum
+        self.nesterov = nesterov
+
+    def _init_state(self, weights):
+        self.velocities = [np.zeros_like(w) for w in weights] if self.momentum else None
+
+    def _update(self, i, w, g, scratch, rate):
+        self._decay(w, rate)
+        if not self.momentum:
+            np.multiply(g, rate, out=scratch)
+            w -= scratch
+            return
+        momentum = w.dtype.type(self.momentum)
+        v = self.velocities[i]
+        v *= momentum
+        v += g
+        if self.nesterov:
+            np.multiply(v, momentum, out=scratch)
+            scratch += g
+            scratch *= rate
+        else:
+            np.multiply(v, rate, out=scratch)
+        w -= scratch
+
+class RMSProp(Optimizer):
+    def __init__(self, learning_rate=0.001, rho=0.9, eps=1e-7, weight_decay=0.0, schedule=None):
+        super().__init__(learning_rate, weight_decay, schedule)
+        self.rho = rho
+        self.eps = eps
+
+    def _init_state(self, weights):
+        self.averages = [np.zeros_like(w) for w in weights]
+
+    def _update(self, i, w, g, scratch, rate):
+        self._decay(w, rate)
+        rho = w.dtype.type(self.rho)
+        average = self.averages[i]
+        average *= rho
+        np.square(g, out=scratch)
+        scratch *= 1 - rho
+        average += scratch
+        np.sqrt(average, out=scratch)
+        scratch += w.dtype.type(self.eps)
+        np.divide(g, scratch, out=scratch)
+        scratch *= rate
+        w -= scratch
+
+class Adam(Optimizer):
+    """Adam; weight_decay se aplica desacoplado del gradiente (AdamW)"""
+
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, eps=1e-7, weight_decay=0.0, schedule=None):
+        super().__init__(learning_rate, weight_decay, schedule)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+
+    def _init_state(self, weights):
+        self.moments = [np.zeros_like(w) for w in weights]
+        self.velocities = [np.zeros_like(w) for w in weights]
+
+    def _update(self, i, w, g, scratch, rate):
+        self._decay(w, rate)
+        beta1, beta2 = w.dtype.type(self.beta1), w.dtype.type(self.beta2)
+        m, v = self.moments[i], self.velocities[i]
+        m *= beta1
+        np.multiply(g, 1 - beta1, out=scratch)
+        m += scratch
+        v *= beta2
+        np.square(g, out=scratch)
+        scratch *= 1 - beta2
+        v += scratch
+        # correccion del sesgo de los primeros pasos, incluida en la tasa
+        t = self.iterations
+        step_rate = rate * math.sqrt(1 - self.beta2 ** t) / (1 - self.beta1 ** t)
+        np.sqrt(v, out=scratch)
+        scratch += w.dtype.type(self.eps)
+        np.divide(m, scratch, out=scratch)
+        scratch *= w.dtype.type(step_rate)
+        w -= scratch
+
+OPTIMIZERS = {"sgd": SGD, "rmsprop": RMSProp, "adam": Adam}
+
+def get_optimizer(spec, learning_rate, **kwargs):
+    """
+    Args:
+        spec: Optimizer, None (SGD simple) o nombre: "sgd", "momentum",
+            "rmsprop" o "adam"
+        learning_rate: Tasa usada cuando spec es un nombre
+        kwargs: Argumentos extra del optimizador (weight_decay, schedule, ...)
+
+    Returns:
+        Optimizer
+    """
+    if isinstance(spec, Optimizer):
+        return spec
+    if spec is None:
+        spec = "sgd"
+    if spec == "momentum":
+        kwargs.setdefault("momentum", 0.9)
+        spec = "sgd"
+    if spec not in OPTIMIZERS:
+        raise ValueError(f"Optimizador desconocido: {spec} (opciones: momentum, {', '.join(OPTIMIZERS)})")
+    return OPTIMIZERS[spec](learning_rate, **kwargs)
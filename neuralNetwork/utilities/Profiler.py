@@ -0,0 +1,155 @@
+import io
+import threading
+import time
+
+# Ganchos de instrumentacion por etapa. Un gancho es cualquier funcion
+# hook(stage, seconds, nbytes) que se registra con add_hook en un
+# ImageProcessor, NeuralNetwork o FaceRecognitionApp. Sin ganchos
+# registrados el costo es revisar una tupla vacia: el reloj ni siquiera se
+# lee. Los ganchos no viajan a los procesos del pool ni a los de
+# ParallelTrainer (solo se mide lo que corre en el proceso actual).
+# cProfile, pstats y tracemalloc se importan solo al usarse: este modulo lo
+# importa la interfaz al arrancar.
+
+class Instrumented:
+    _hooks = ()
+
+    def add_hook(self, hook):
+        """
+        Args:
+            hook: Funcion hook(stage, seconds, nbytes) llamada al terminar
+                cada etapa; nbytes es el tamaño del resultado de la etapa
+                (0 si no aplica)
+        """
+        self._hooks = self._hooks + (hook,)
+
+    def remove_hook(self, hook):
+        self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    def _emit(self, stage, start, nbytes=0):
+        seconds = time.perf_counter() - start
+        for hook in self._hooks:
+            hook(stage, seconds, nbytes)
+
+class StageTimings:
+    """
+    Gancho que acumula llamadas, tiempo y bytes por etapa
+
+    Se puede registrar en varios componentes a la vez y llamar desde varios
+    hilos (la interfaz infiere en un hilo aparte).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def __call__(self, stage, seconds, nbytes=0):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0}
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["bytes"] += nbytes
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+    def report(self):
+        """Tabla por etapa ordenada por tiempo total"""
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1]["total"], reverse=True)
+        if not stages:
+            return "Sin etapas medidas"
+        lines = [f"{'etapa':28s} {'llamadas':>9s} {'total ms':>10s} {'media ms':>10s} {'max ms':>10s} {'MB':>9s}"]
+        for stage, entry in stages:
+            lines.append(
+                f"{stage:28s} {entry['count']:9d} {entry['total'] * 1000:10.2f} "
+                f"{entry['total'] * 1000 / entry['count']:10.3f} {entry['max'] * 1000:10.3f} "
+                f"{entry['bytes'] / 2**20:9.2f}"
+            )
+        return "\n".join(lines)
+
+class Profiler:
+    """
+    Mide por etapa los componentes dados y, opcionalmente, captura cProfile
+    y tracemalloc mientras dura el bloque with
+
+        with Profiler(processor, network, cprofile=True, trace_memory=True) as profiler:
+            ...
+        print(profiler.report())
+    """
+
+    def __init__(self, *components, cprofile=False, trace_memory=False, top=15):
+        """
+        Args:
+            components: Objetos Instrumented donde registrar el gancho de tiempos
+            cprofile: Si se captura el perfil de funciones con cProfile
+            trace_memory: Si se registran las reservas de memoria con tracemalloc
+                (hace todo bastante mas lento mientras esta activo)
+            top: Funciones y lineas que se muestran en el reporte
+        """
+        self.components = list(components)
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.timings = StageTimings()
+        self._profile = None
+        self._snapshot = None
+        self._peak = None
+        self._started_tracing = False
+
+    def attach(self, component):
+        """Agrega un componente mientras el perfilador esta activo"""
+        self.components.append(component)
+        component.add_hook(self.timings)
+
+    def __enter__(self):
+        for component in self.components:
+            component.add_hook(self.timings)
+        if self.trace_memory:
+            import tracemalloc
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._profile is not None:
+            self._profile.disable()
+        if self.trace_memory:
+            import tracemalloc
+            self._snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            self._peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+        for component in self.components:
+            component.remove_hook(self.timings)
+        return False
+
+    def report(self):
+        """Resumen en texto: etapas, funciones mas costosas y reservas de memoria"""
+        sections = ["== Etapas ==", self.timings.report()]
+        if self._profile is not None:
+            import pstats
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            sections += ["== cProfile (tiempo acumulado) ==", stream.getvalue().strip()]
+        if self._snapshot is not None:
+            sections.append("== tracemalloc ==")
+            sections.append(f"Pico de memoria reservada: {self._peak / 2**20:.2f} MB")
+            for stat in self._snapshot.statistics("lineno")[:self.top]:
+                frame = stat.traceback[0]
+                sections.append(f"{stat.size / 2**20:9.2f} MB {stat.count:7d} bloques  {frame.filename}:{frame.lineno}")
+        return "\n".join(sections)
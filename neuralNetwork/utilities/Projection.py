@@ -0,0 +1,394 @@
+import time
+import numpy as np
+from .Profiler import Instrumented
+
+# Reduccion de dimension de los pixeles antes de la red. Una imagen de
+# 700x600 son 420,000 entradas y la primera capa domina el costo; una
+# proyeccion ajustada una sola vez deja unos cientos de caracteristicas, y
+# la red (y su entrenamiento) trabaja solo sobre ellas.
+#
+# El ajuste recorre la matriz por lotes (np.memmap de un FeatureStore), sin
+# cargarla completa. Las entradas uint8 se escalan por 1/255 como en el
+# resto del proyecto. Toda proyeccion termina en
+#     salida = (x @ W) * escala_de_entrada - offset
+# con la normalizacion (blanqueo o estandarizacion) ya incluida en W y offset.
+
+# memoria maxima de los buffers temporales de PCAProjection (bloque de
+# entradas convertido a float, productos parciales del ajuste)
+SCRATCH_BYTES = 32 * 2**20
+
+def _orthonormalize_rows(matrix, block=32):
+    """
+    Ortonormaliza en su lugar las filas de matrix (l x input_size)
+
+    Gram-Schmidt por bloques con reortogonalizacion ("dos veces basta"):
+    cada bloque de filas se proyecta dos veces contra las anteriores con
+    productos matriciales y luego se ortonormaliza fila por fila. A
+    diferencia de np.linalg.qr, que con float32 trabaja en float64 y reserva
+    varias copias de la matriz, solo usa un temporal de block filas.
+    """
+    count, size = matrix.shape
+    block = max(1, min(block, SCRATCH_BYTES // (size * matrix.itemsize)))
+    scratch = np.empty((block, size), dtype=matrix.dtype)
+    for start in range(0, count, block):
+        rows = matrix[start:start + block]
+        previous = matrix[:start]
+        removed = scratch[:len(rows)]
+        for _ in range(2):
+            if start:
+                np.dot(rows @ previous.T, previous, out=removed)
+                rows -= removed
+        for i in range(len(rows)):
+            row = rows[i]
+            for _ in range(2):
+                if i:
+                    row -= (rows[:i] @ row) @ rows[:i]
+            norm = np.linalg.norm(row)
+            # una fila nula (datos de rango menor que l) se deja en cero
+            if norm > 0:
+                row /= norm
+    return matrix
+
+class Projection(Instrumented):
+    # etapa medida con add_hook: project
+    name = None
+
+    def __init__(self, n_components, dtype=np.float32, seed=None):
+        """
+        Args:
+            n_components: Numero de caracteristicas de salida
+            dtype: Tipo de dato de la salida y de la matriz de proyeccion
+            seed: Semilla de las matrices aleatorias
+        """
+        self.n_components = int(n_components)
+        self.dtype = np.dtype(dtype)
+        self.seed = seed
+        self.input_size = None
+        self.offset = None
+
+    @property
+    def fitted(self):
+        return self.offset is not None
+
+    def _iter_rows(self, features, indices, batch_size):
+        """Lotes (en el dtype de la proyeccion, escalados a [0, 1] si son uint8)"""
+        scale = 1 / 255.0 if features.dtype == np.uint8 else 1.0
+        if indices is None:
+            indices = np.arange(len(features))
+        # ordenados: lectura secuencial del memmap
+        indices = np.sort(np.asarray(indices))
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            yield np.multiply(features[batch], scale, dtype=self.dtype)
+
+    def fit(self, features, indices=None, batch_size=64):
+        """
+        Ajusta la proyeccion recorriendo features por lotes
+
+        Args:
+            features: Matriz (N, input_size), p. ej. FeatureStore.features
+            indices: Filas usadas para ajustar (por defecto todas); usar solo
+                las de entrenamiento
+            batch_size: Filas convertidas a float a la vez
+
+        Returns:
+            self
+        """
+        raise NotImplementedError
+
+    def _project(self, x, out):
+        """x @ W sin normalizar, escrito en out"""
+        raise NotImplementedError
+
+    def transform(self, inputs, out=None):
+        """
+        Args:
+            inputs: Matriz (N, input_size) o vector (input_size,), en uint8
+                (pixeles 0-255) o flotante (0 a 1)
+            out: Matriz (N, n_components) opcional donde escribir
+
+        Returns:
+            Matriz (N, n_components), o (n_components,) para un vector
+        """
+        if not self.fitted:
+            raise ValueError("La proyeccion no esta ajustada (ver fit)")
+        hooks = self._hooks
+        if hooks:
+            start = time.perf_counter()
+        inputs = np.asarray(inputs)
+        single = inputs.ndim == 1
+        if single:
+            inputs = inputs.reshape(1, -1)
+        if inputs.shape[1] != self.input_size:
+            raise ValueError(f"Se esperaban {self.input_size} entradas, hay {inputs.shape[1]}")
+        if out is None:
+            out = np.empty((len(inputs), self.n_components), dtype=self.dtype)
+        self._project(inputs, out)
+        if inputs.dtype == np.uint8:
+            out *= self.dtype.type(1 / 255.0)
+        out -= self.offset
+        if hooks:
+            self._emit("project", start, out.nbytes)
+        return out[0] if single else out
+
+    def transform_features(self, features, indices=None, batch_size=64):
+        """
+        Proyecta una matriz grande (p. ej. FeatureStore.features) por lotes
+
+        Returns:
+            Matriz (len(indices), n_components) en memoria
+        """
+        if indices is None:
+            indices = np.arange(len(features))
+        indices = np.asarray(indices)
+        out = np.empty((len(indices), self.n_components), dtype=self.dtype)
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            # el memmap se lee en orden y el resultado se deja en el orden pedido
+            order = np.argsort(batch, kind="stable")
+            out[start + order] = self.transform(features[batch[order]])
+        return out
+
+    def get_config(self):
+        return {
+            "type": self.name, "n_components": self.n_components,
+            "input_size": self.input_size, "dtype": self.dtype.name, "seed": self.seed,
+        }
+
+    def get_arrays(self):
+        """dict nombre -> arreglo con el estado ajustado"""
+        raise NotImplementedError
+
+    @classmethod
+    def from_config(cls, config, arrays):
+        projection = cls.__new__(cls)
+        projection.n_components = config["n_components"]
+        projection.input_size = config["input_size"]
+        projection.dtype = np.dtype(config["dtype"])
+        projection.seed = config.get("seed")
+        for name, array in arrays.items():
+            setattr(projection, name, array)
+        return projection
+
+class PCAProjection(Projection):
+    """
+    PCA aleatorizado en streaming (Halko, Martinsson y Tropp)
+
+    Cada pasada lee la matriz una vez por lotes:
+        1. media de cada pixel
+        2. Z = Xc^T Omega, con Omega gaussiana (N x l), l = componentes + oversample
+        3. (power_iterations veces) Z = Xc^T (Xc Q), con Q = ortonormal(Z)
+        4. B = Xc Q (N x l, pequeña) y svd(B) da las componentes Q @ V
+    Z y Q se guardan transpuestas (l x input_size) y se ortonormalizan en su
+    lugar. Memoria extra: 2 matrices de input_size x l durante las
+    iteraciones (Q y la nueva Z; solo Z si power_iterations es 0), mas
+    buffers de hasta SCRATCH_BYTES y el lote actual. Para 420,000 pixeles
+    y l = 266 en float32 son unos 900 MB.
+    """
+
+    name = "pca"
+
+    def __init__(self, n_components, whiten=True, oversample=10, power_iterations=2,
+                 dtype=np.float32, seed=None):
+        """
+        Args:
+            n_components: Numero de componentes principales
+            whiten: Si cada componente se divide por su desviacion estandar
+                (salidas con varianza 1, mejor para entrenar la red)
+            oversample: Columnas extra del bosquejo aleatorio
+            power_iterations: Pasadas extra que afinan las componentes cuando
+                el espectro decae lento (como en imagenes)
+        """
+        super().__init__(n_components, dtype, seed)
+        self.whiten = whiten
+        self.oversample = oversample
+        self.power_iterations = power_iterations
+
+    def fit(self, features, indices=None, batch_size=64):
+        count = len(features) if indices is None else len(indices)
+        rank = min(self.n_components + self.oversample, count, features.shape[1])
+        if self.n_components > min(count, features.shape[1]):
+            raise ValueError(f"n_components ({self.n_components}) no puede ser mayor que "
+                             f"min(muestras, entradas) = {min(count, features.shape[1])}")
+        self.input_size = features.shape[1]
+        rng = np.random.default_rng(self.seed)
+
+        mean = np.zeros(self.input_size, dtype=np.float64)
+        for x in self._iter_rows(features, indices, batch_size):
+            mean += x.sum(axis=0, dtype=np.float64)
+        mean = (mean / count).astype(self.dtype)
+
+        def centered_batches():
+            for x in self._iter_rows(features, indices, batch_size):
+                x -= mean
+                yield x
+
+        sketch = np.zeros((rank, self.input_size), dtype=self.dtype)
+        for x in centered_batches():
+            self._accumulate(sketch, rng.standard_normal((len(x), rank), dtype=self.dtype).T, x)
+        basis = _orthonormalize_rows(sketch)
+        sketch = np.empty_like(basis) if self.power_iterations else None
+        for _ in range(self.power_iterations):
+            sketch.fill(0)
+            for x in centered_batches():
+                self._accumulate(sketch, (x @ basis.T).T, x)
+            # la Z nueva pasa a ser la base; la base anterior se reutiliza
+            basis, sketch = _orthonormalize_rows(sketch), basis
+        del sketch
+
+        reduced = np.concatenate([x @ basis.T for x in centered_batches()])
+        _, singular_values, vt = np.linalg.svd(reduced, full_matrices=False)
+        components = np.empty((self.input_size, self.n_components), dtype=self.dtype)
+        np.dot(basis.T, vt[:self.n_components].T.astype(self.dtype), out=components)
+        del basis
+        self.explained_variance = (singular_values[:self.n_components] ** 2 / max(count - 1, 1)).astype(self.dtype)
+        if self.whiten:
+            components /= np.sqrt(np.maximum(self.explained_variance, np.finfo(self.dtype).tiny))
+        self.components = np.ascontiguousarray(components, dtype=self.dtype)
+        self.offset = (mean @ self.components).astype(self.dtype)
+        return self
+
+    def _accumulate(self, total, left, x):
+        """total += left @ x, por bloques de columnas en un buffer acotado"""
+        rows = len(total)
+        width = max(1, SCRATCH_BYTES // (rows * self.dtype.itemsize))
+        scratch = np.empty(rows * min(width, total.shape[1]), dtype=self.dtype)
+        for start in range(0, total.shape[1], width):
+            end = min(start + width, total.shape[1])
+            product = scratch[:rows * (end - start)].reshape(rows, end - start)
+            np.dot(left, x[:, start:end], out=product)
+            total[:, start:end] += product
+
+    def _project(self, x, out):
+        if x.dtype == self.dtype:
+            np.dot(x, self.components, out=out)
+            return
+        # uint8 (o float64): BLAS necesita ambos operandos del mismo tipo. En
+        # vez de copiar el lote completo a float, se convierte por bloques de
+        # columnas en un buffer de hasta SCRATCH_BYTES y se acumula
+        # x[:, bloque] @ W[bloque]; cada fila de W se lee una sola vez
+        count, size = x.shape
+        width = max(1, min(size, SCRATCH_BYTES // (max(count, 1) * self.dtype.itemsize)))
+        scratch = getattr(self, "_scratch", None)
+        if scratch is None or len(scratch) < count * width:
+            scratch = self._scratch = np.empty(count * width, dtype=self.dtype)
+        partial = np.empty_like(out) if width < size else None
+        for start in range(0, size, width):
+            end = min(start + width, size)
+            # contiguo: BLAS no hace otra copia del bloque
+            block = scratch[:count * (end - start)].reshape(count, end - start)
+            np.copyto(block, x[:, start:end], casting="unsafe")
+            if start == 0:
+                np.dot(block, self.components[start:end], out=out)
+            else:
+                np.dot(block, self.components[start:end], out=partial)
+                out += partial
+
+    def get_config(self):
+        config = super().get_config()
+        config["whiten"] = self.whiten
+        return config
+
+    def get_arrays(self):
+        return {"components": self.components, "offset": self.offset,
+                "explained_variance": self.explained_variance}
+
+    @classmethod
+    def from_config(cls, config, arrays):
+        projection = super().from_config(config, arrays)
+        projection.whiten = config.get("whiten", True)
+        return projection
+
+class SparseRandomProjection(Projection):
+    """
+    Proyeccion aleatoria dispersa (Achlioptas; Li, Hastie y Church)
+
+    Cada componente suma +-1 sobre una fraccion density de los pixeles
+    (por defecto 1/sqrt(input_size): unos 650 de 420,000), asi que aplicarla
+    cuesta mucho menos que una matriz densa. No necesita ajuste salvo una
+    pasada que estandariza cada componente (media 0, varianza 1).
+    La matriz se guarda como listas de indices por componente (tipo CSR).
+    """
+
+    name = "random"
+
+    def __init__(self, n_components, density=None, dtype=np.float32, seed=None):
+        """
+        Args:
+            density: Fraccion de pixeles distintos de cero por componente;
+                por defecto 1/sqrt(input_size)
+        """
+        super().__init__(n_components, dtype, seed)
+        self.density = density
+
+    def _build(self, input_size):
+        rng = np.random.default_rng(self.seed)
+        density = self.density if self.density is not None else 1 / np.sqrt(input_size)
+        counts = np.maximum(rng.binomial(input_size, density, size=self.n_components), 1)
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.indices = np.concatenate([
+            np.sort(rng.choice(input_size, size=count, replace=False)) for count in counts
+        ]).astype(np.int32)
+        self.weights = rng.choice(np.array([-1.0, 1.0], dtype=self.dtype), size=len(self.indices))
+        self.input_size = input_size
+
+    def fit(self, features, indices=None, batch_size=64):
+        self._build(features.shape[1])
+        total = np.zeros(self.n_components, dtype=np.float64)
+        total_sq = np.zeros(self.n_components, dtype=np.float64)
+        count = 0
+        projected = np.empty((batch_size, self.n_components), dtype=self.dtype)
+        for x in self._iter_rows(features, indices, batch_size):
+            out = projected[:len(x)]
+            self._project(x, out)
+            total += out.sum(axis=0, dtype=np.float64)
+            total_sq += np.square(out, dtype=np.float64).sum(axis=0)
+            count += len(x)
+        mean = total / max(count, 1)
+        std = np.sqrt(np.maximum(total_sq / max(count, 1) - mean ** 2, 0.0))
+        std[std == 0] = 1.0
+        # la estandarizacion queda dentro de los pesos y el offset
+        self.weights *= np.repeat(1 / std, np.diff(self.indptr)).astype(self.dtype)
+        self.offset = (mean / std).astype(self.dtype)
+        return self
+
+    def _project(self, x, out):
+        # solo se leen las columnas usadas; reduceat suma cada componente
+        gathered = np.multiply(x[:, self.indices], self.weights, dtype=self.dtype)
+        np.add.reduceat(gathered, self.indptr[:-1], axis=1, out=out)
+
+    def get_config(self):
+        config = super().get_config()
+        config["density"] = self.density
+        return config
+
+    def get_arrays(self):
+        return {"indices": self.indices, "indptr": self.indptr, "weights": self.weights, "offset": self.offset}
+
+    @classmethod
+    def from_config(cls, config, arrays):
+        projection = super().from_config(config, arrays)
+        projection.density = config.get("density")
+        return projection
+
+PROJECTIONS = {cls.name: cls for cls in (PCAProjection, SparseRandomProjection)}
+
+def get_projection(spec, n_components=256, **kwargs):
+    """
+    Args:
+        spec: Projection, None (sin proyeccion) o nombre: "pca" o "random"
+        n_components: Caracteristicas de salida cuando spec es un nombre
+        kwargs: Argumentos extra de la proyeccion (whiten, density, seed, ...)
+
+    Returns:
+        Projection (sin ajustar si spec es un nombre) o None
+    """
+    if spec is None or isinstance(spec, Projection):
+        return spec
+    if spec not in PROJECTIONS:
+        raise ValueError(f"Proyeccion desconocida: {spec} (opciones: {', '.join(PROJECTIONS)})")
+    return PROJECTIONS[spec](n_components, **kwargs)
+
+def projection_from_config(config, arrays):
+    """Reconstruye una proyeccion guardada (get_config + get_arrays)"""
+    return PROJECTIONS[config["type"]].from_config(config, arrays)
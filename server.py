@@ -0,0 +1,213 @@
+"""
+Servidor HTTP local de inferencia
+
+    python server.py modelo.nnmodel [--port 8000] [--max-batch-size 32] [--max-wait-ms 5]
+
+Endpoints:
+    POST /predict   cuerpo: bytes de la imagen -> {"probability": ..., "recognized": ...}
+    GET  /health    estado del servidor y tamaño promedio de lote
+
+Las peticiones concurrentes se agrupan en un solo producto matricial
+(micro-lotes); la decodificación de imágenes corre en un pool de hilos o
+de procesos, así el bucle de eventos solo mueve bytes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from neuralNetwork.NeuralNetwork import NeuralNetwork
+from neuralNetwork.utilities.ImageProcessor import ImageProcessor, processor_for
+
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+def decode_image(params, data):
+    """Bytes de una imagen -> vector uint8 (corre en el pool de decodificación)"""
+    # un ImageProcessor por hilo o proceso del pool, no uno por petición
+    return processor_for(params).decode(data).ravel()
+
+class MicroBatcher:
+    """
+    Agrupa las entradas que llegan casi al mismo tiempo en un solo forward
+
+    Se espera como máximo max_wait segundos desde la primera entrada del lote
+    (o hasta juntar max_batch_size) y luego se ejecuta la red en un hilo
+    dedicado, para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, network, feature_size, max_batch_size=32, max_wait=0.005):
+        self.network = network
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        # un solo hilo: la red reutiliza sus buffers de activacion
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.inputs = np.empty((max_batch_size, feature_size), dtype=np.uint8)
+        network.reserve(max_batch_size, uint8_inputs=network.projection is None)
+        self.batches = 0
+        self.items = 0
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def predict(self, vector):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((vector, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # un error (p. ej. un vector de otro tamaño o el forward) se pasa a
+            # cada peticion del lote; el bucle sigue atendiendo las siguientes
+            try:
+                for i, (vector, _) in enumerate(batch):
+                    self.inputs[i] = vector
+                probabilities = await loop.run_in_executor(self.executor, self.forward, len(batch))
+            except Exception as e:
+                print(f"Error en el forward del lote: {e!r}", file=sys.stderr)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+
+    def forward(self, count):
+        inputs = self.inputs[:count]
+        if self.network.projection is not None:
+            inputs = self.network.projection.transform(inputs)
+        return self.network.forward(inputs)[:, 0].copy()
+
+class InferenceServer:
+    def __init__(self, model_path, max_batch_size=32, max_wait=0.005,
+                 decode_workers=None, use_processes=False):
+        self.network = NeuralNetwork.load(model_path, mmap_mode="r")
+        if self.network.preprocessing:
+            self.processor = ImageProcessor.from_params(self.network.preprocessing)
+        else:
+            self.processor = ImageProcessor()
+        self.params = self.processor.get_params()
+        self.batcher = MicroBatcher(self.network, self.processor.feature_size, max_batch_size, max_wait)
+        if decode_workers is None:
+            decode_workers = os.cpu_count() or 1
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.decode_pool = pool_class(max_workers=decode_workers)
+        self.started = time.time()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ConnectionError("cuerpo demasiado grande")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {
+                "status": "ok",
+                "uptime": time.time() - self.started,
+                "batches": self.batcher.batches,
+                "average_batch_size": self.batcher.items / max(self.batcher.batches, 1),
+            }
+        if method == "POST" and path == "/predict":
+            if not body:
+                return 400, {"error": "cuerpo vacío, se esperaba una imagen"}
+            loop = asyncio.get_running_loop()
+            try:
+                vector = await loop.run_in_executor(self.decode_pool, decode_image, self.params, body)
+            except Exception as e:
+                return 400, {"error": f"no se pudo leer la imagen: {e}"}
+            try:
+                probability = await self.batcher.predict(vector)
+            except Exception as e:
+                return 500, {"error": f"error interno al evaluar la imagen: {e}"}
+            return 200, {"probability": probability, "recognized": probability > self.network.threshold}
+        return 404, {"error": "no encontrado"}
+
+    def write_response(self, writer, status, payload, keep_alive):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def serve(self, host, port):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Servidor escuchando en http://{host}:{port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP local de inferencia")
+    parser.add_argument("model", help="Archivo del modelo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--decode-workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="Decodificar en procesos en vez de hilos")
+    args = parser.parse_args(argv)
+
+    server = InferenceServer(
+        args.model, args.max_batch_size, args.max_wait_ms / 1000.0,
+        args.decode_workers, args.processes
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
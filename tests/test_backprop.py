@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neuralNetwork.NeuralNetwork import NeuralNetwork
+
+# Revisa backProp contra diferencias finitas (NeuralNetwork.gradient_check)
+# en float64, para cada activacion oculta y perdida, con sesgos y con
+# entradas uint8 (que forward convierte y escala por 1/255).
+
+TOLERANCE = 1e-4
+ACTIVATIONS = ["sigmoid", "tanh", "relu", "leaky_relu:0.1"]
+
+def make_network(activation, loss, use_bias=True, input_size=12):
+    return NeuralNetwork(
+        input_size, layers=[8, 5], output_size=1, dtype=np.float64,
+        activations=activation, loss=loss, use_bias=use_bias, seed=0
+    )
+
+def make_data(input_size=12, count=6, seed=1):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((count, input_size))
+    y = rng.integers(0, 2, size=(count, 1)).astype(np.float64)
+    return x, y
+
+@pytest.mark.parametrize("loss", ["bce", "mse"])
+@pytest.mark.parametrize("activation", ACTIVATIONS)
+def test_gradient_check(activation, loss):
+    network = make_network(activation, loss)
+    x, y = make_data()
+    assert network.gradient_check(x, y, samples=30, seed=2) < TOLERANCE
+
+@pytest.mark.parametrize("activation", ACTIVATIONS)
+def test_gradient_check_without_bias(activation):
+    network = make_network(activation, "bce", use_bias=False)
+    x, y = make_data()
+    assert network.gradient_check(x, y, samples=30, seed=2) < TOLERANCE
+
+@pytest.mark.parametrize("loss", ["bce", "mse"])
+@pytest.mark.parametrize("activation", ACTIVATIONS)
+def test_gradient_check_uint8_inputs(activation, loss):
+    network = make_network(activation, loss)
+    rng = np.random.default_rng(3)
+    x = rng.integers(0, 256, size=(6, 12), dtype=np.uint8)
+    y = rng.integers(0, 2, size=(6, 1)).astype(np.float64)
+    assert network.gradient_check(x, y, samples=30, seed=2) < TOLERANCE
+
+def test_uint8_inputs_match_scaled_float():
+    network = make_network("relu", "bce")
+    x = np.random.default_rng(4).integers(0, 256, size=(6, 12), dtype=np.uint8)
+    expected = network.forward(x / 255.0).copy()
+    np.testing.assert_allclose(network.forward(x), expected, rtol=1e-12)
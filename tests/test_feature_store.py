@@ -0,0 +1,146 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neuralNetwork.utilities.FeatureStore import FeatureStore
+from neuralNetwork.utilities import ImageProcessor as image_processor
+from neuralNetwork.utilities.ImageProcessor import ImageProcessor
+
+# Revisa que FeatureStore mantenga features.bin, labels.npy y el manifiesto
+# consistentes (append interrumpido, remove, relabel) y que
+# update_feature_store solo procese los archivos nuevos o modificados.
+
+FEATURE_SIZE = 6
+
+def rows(count, start=0):
+    return [
+        (f"img{i}.png", np.full(FEATURE_SIZE, i, dtype=np.uint8), i % 2)
+        for i in range(start, start + count)
+    ]
+
+def assert_consistent(store):
+    size = os.path.getsize(os.path.join(store.directory, FeatureStore.FEATURES_FILE))
+    assert size == len(store) * store.feature_size
+    assert len(store.labels) == len(store) == len(store.files)
+    # el manifiesto en disco coincide con el objeto
+    reopened = FeatureStore(store.directory)
+    assert reopened.files == store.files
+    np.testing.assert_array_equal(reopened.labels, store.labels)
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeatureStore.create(str(tmp_path / "store"), FEATURE_SIZE)
+    store.append(rows(4))
+    return store
+
+def test_append(store):
+    assert len(store) == 4
+    assert store.files == [f"img{i}.png" for i in range(4)]
+    np.testing.assert_array_equal(store.labels, [0, 1, 0, 1])
+    np.testing.assert_array_equal(store.features[:, 0], [0, 1, 2, 3])
+    assert_consistent(store)
+
+def test_append_failing_midway_keeps_store_consistent(store):
+    def failing():
+        yield from rows(2, start=4)
+        raise RuntimeError("fallo del decodificador")
+
+    with pytest.raises(RuntimeError):
+        store.append(failing())
+    assert len(store) == 4
+    assert_consistent(store)
+
+    # el siguiente append escribe en el desplazamiento correcto
+    store.append(rows(1, start=10))
+    np.testing.assert_array_equal(store.features[:, 0], [0, 1, 2, 3, 10])
+    assert_consistent(store)
+
+def test_append_wrong_size_keeps_store_consistent(store):
+    records = rows(1, start=4) + [("mal.png", np.zeros(FEATURE_SIZE + 1, dtype=np.uint8), 0)]
+    with pytest.raises(ValueError):
+        store.append(records)
+    assert len(store) == 4
+    assert_consistent(store)
+
+def test_orphan_rows_are_truncated_on_open(store):
+    # filas escritas sin registrar (p. ej. el proceso murio antes del manifiesto)
+    with open(os.path.join(store.directory, FeatureStore.FEATURES_FILE), "ab") as f:
+        f.write(bytes(3 * FEATURE_SIZE))
+    reopened = FeatureStore(store.directory)
+    assert len(reopened) == 4
+    assert_consistent(reopened)
+
+def test_remove_compacts_rows(store):
+    store.append(rows(4, start=4))
+    entries = {"img1.png": {"sha1": "x"}, "img5.png": {"sha1": "y"}}
+    store.manifest["entries"].update(entries)
+    assert store.remove(["img1.png", "img5.png", "no_existe.png"], chunk_rows=2) == 2
+    assert store.files == ["img0.png", "img2.png", "img3.png", "img4.png", "img6.png", "img7.png"]
+    np.testing.assert_array_equal(store.features[:, 0], [0, 2, 3, 4, 6, 7])
+    np.testing.assert_array_equal(store.labels, [0, 0, 1, 0, 0, 1])
+    assert store.manifest["entries"] == {}
+    assert_consistent(store)
+
+def test_remove_all_and_nothing(store):
+    assert store.remove(["no_existe.png"]) == 0
+    assert len(store) == 4
+    assert store.remove(list(store.files)) == 4
+    assert len(store) == 0
+    assert store.features.shape == (0, FEATURE_SIZE)
+    assert_consistent(store)
+
+def test_relabel_keeps_features(store):
+    before = np.array(store.features)
+    store.relabel(lambda file: 1 if file == "img2.png" else 0)
+    np.testing.assert_array_equal(store.labels, [0, 0, 1, 0])
+    np.testing.assert_array_equal(store.features, before)
+    assert_consistent(store)
+
+def write_image(path, value):
+    Image.fromarray(np.full((8, 10), value, dtype=np.uint8)).save(path)
+
+def test_update_feature_store_skips_unchanged(tmp_path, monkeypatch):
+    decoded = []
+    process_file = image_processor._process_file
+
+    def counting(params, initial_image_path, *args, **kwargs):
+        decoded.append(os.path.basename(initial_image_path))
+        return process_file(params, initial_image_path, *args, **kwargs)
+
+    monkeypatch.setattr(image_processor, "_process_file", counting)
+    source = tmp_path / "imgs"
+    source.mkdir()
+    for i, name in enumerate(["a.png", "b_gerardo.png", "c.png"]):
+        write_image(source / name, 40 * (i + 1))
+    store_directory = str(tmp_path / "store")
+    processor = ImageProcessor(target_size=(5, 4))
+    processor.build_feature_store(str(source), store_directory)
+    assert sorted(decoded) == ["a.png", "b_gerardo.png", "c.png"]
+
+    # mismo contenido con otro mtime: se compara el hash y no se procesa
+    os.utime(source / "a.png", (1, 1))
+    # contenido nuevo: cambia el hash y se vuelve a procesar
+    write_image(source / "c.png", 250)
+    os.utime(source / "c.png", (2, 2))
+    os.remove(source / "b_gerardo.png")
+    write_image(source / "d_gerardo.png", 90)
+
+    decoded.clear()
+    store = processor.update_feature_store(str(source), store_directory)
+    assert sorted(decoded) == ["c.png", "d_gerardo.png"]
+    assert store.files == ["a.png", "c.png", "d_gerardo.png"]
+    np.testing.assert_array_equal(store.labels, [0, 0, 1])
+    np.testing.assert_array_equal(store.features[:, 0], [40, 250, 90])
+    assert store.manifest["entries"]["a.png"]["mtime"] == 1
+    # las entradas de los archivos procesados traen el hash calculado en _process_file
+    assert store.manifest["entries"]["c.png"]["sha1"] == image_processor.file_hash(str(source / "c.png"))
+    assert_consistent(store)
+
+    # sin cambios no se procesa nada
+    decoded.clear()
+    processor.update_feature_store(str(source), store_directory)
+    assert decoded == []
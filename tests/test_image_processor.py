@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neuralNetwork.utilities.ImageProcessor import ImageProcessor, find_images
+
+# Revisa que solo se listen imagenes (por extension) y que los archivos que
+# no lo son, o los subdirectorios, no lleguen al almacen.
+
+def make_directory(root):
+    image = Image.fromarray(np.full((8, 10), 100, dtype=np.uint8))
+    image.save(root / "b.png")
+    image.save(root / "A.JPG")
+    image.save(root / "c.jpeg")
+    (root / "notas.txt").write_text("no es imagen")
+    (root / "datos.csv").write_text("1,2,3")
+    (root / "sin_extension").write_bytes(b"\x00")
+    # un directorio con nombre de imagen no es un archivo
+    (root / "carpeta.png").mkdir()
+    (root / "sub").mkdir()
+    image.save(root / "sub" / "d.png")
+
+def test_list_images_filters_extensions_and_directories(tmp_path):
+    make_directory(tmp_path)
+    assert ImageProcessor().list_images(str(tmp_path)) == ["A.JPG", "b.png", "c.jpeg"]
+
+def test_find_images_recursive(tmp_path):
+    make_directory(tmp_path)
+    names = [os.path.relpath(path, tmp_path) for path in find_images(str(tmp_path))]
+    assert names == ["A.JPG", "b.png", "c.jpeg", os.path.join("sub", "d.png")]
+    assert len(find_images(str(tmp_path), recursive=False)) == 3
+
+def test_build_feature_store_skips_non_images(tmp_path):
+    source = tmp_path / "imgs"
+    source.mkdir()
+    make_directory(source)
+    store = ImageProcessor(target_size=(5, 4)).build_feature_store(str(source), str(tmp_path / "store"))
+    assert store.files == ["A.JPG", "b.png", "c.jpeg"]
+    assert sorted(store.manifest["entries"]) == store.files
@@ -0,0 +1,88 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neuralNetwork.utilities.Metrics import auc, binary_report, confusion_matrix, precision_recall, roc_curve
+
+# Revisa las metricas contra calculos directos: el AUC contra la definicion
+# por pares (probabilidad de que un positivo tenga mayor score que un
+# negativo, empates cuentan 1/2) y los casos sin muestras o con una sola clase.
+
+def pairwise_auc(y_true, scores):
+    positives = scores[y_true == 1]
+    negatives = scores[y_true == 0]
+    total = 0.0
+    for p in positives:
+        for n in negatives:
+            total += 1.0 if p > n else 0.5 if p == n else 0.0
+    return total / (len(positives) * len(negatives))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_auc_matches_pairwise(seed):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 2, size=200)
+    scores = rng.random(200)
+    fpr, tpr, _ = roc_curve(y_true, scores)
+    assert auc(fpr, tpr) == pytest.approx(pairwise_auc(y_true, scores), abs=1e-12)
+
+def test_auc_matches_pairwise_with_ties():
+    rng = np.random.default_rng(7)
+    y_true = rng.integers(0, 2, size=300)
+    # pocos valores distintos: muchos empates entre positivos y negativos
+    scores = rng.integers(0, 6, size=300) / 5
+    fpr, tpr, _ = roc_curve(y_true, scores)
+    assert auc(fpr, tpr) == pytest.approx(pairwise_auc(y_true, scores), abs=1e-12)
+
+def test_roc_curve_endpoints_and_thresholds():
+    y_true = np.array([0, 1, 1, 0, 1])
+    scores = np.array([0.1, 0.9, 0.4, 0.4, 0.8])
+    fpr, tpr, thresholds = roc_curve(y_true, scores)
+    np.testing.assert_allclose(fpr, [0, 0, 0, 0.5, 1])
+    np.testing.assert_allclose(tpr, [0, 1 / 3, 2 / 3, 1, 1])
+    np.testing.assert_allclose(thresholds, [np.inf, 0.9, 0.8, 0.4, 0.1])
+
+def test_perfect_and_inverted_scores():
+    y_true = np.array([0, 0, 1, 1])
+    scores = np.array([0.1, 0.2, 0.8, 0.9])
+    assert auc(*roc_curve(y_true, scores)[:2]) == 1.0
+    assert auc(*roc_curve(y_true, 1 - scores)[:2]) == 0.0
+
+def test_empty_input():
+    fpr, tpr, thresholds = roc_curve([], [])
+    assert np.isnan(fpr).all() and np.isnan(tpr).all()
+    assert np.isinf(thresholds).all()
+    assert math.isnan(auc(fpr, tpr))
+    report = binary_report([], [])
+    assert report["accuracy"] == 0.0
+    assert math.isnan(report["auc"])
+    np.testing.assert_array_equal(report["confusion_matrix"], np.zeros((2, 2)))
+
+@pytest.mark.parametrize("label", [0, 1])
+def test_single_class(label):
+    y_true = np.full(4, label)
+    scores = np.array([0.2, 0.6, 0.6, 0.9])
+    fpr, tpr, _ = roc_curve(y_true, scores)
+    # la tasa de la clase ausente no esta definida; la otra si
+    missing, present = (tpr, fpr) if label == 0 else (fpr, tpr)
+    assert np.isnan(missing).all()
+    np.testing.assert_allclose(present, [0, 0.25, 0.75, 1])
+    assert math.isnan(auc(fpr, tpr))
+    assert math.isnan(binary_report(y_true, scores)["auc"])
+
+def test_single_sample():
+    fpr, tpr, _ = roc_curve([1], [0.7])
+    assert math.isnan(auc(fpr, tpr))
+
+def test_confusion_matrix_and_precision_recall():
+    y_true = np.array([1, 1, 0, 0, 1, 0])
+    y_pred = np.array([1, 0, 0, 1, 1, 0])
+    matrix = confusion_matrix(y_true, y_pred)
+    np.testing.assert_array_equal(matrix, [[2, 1], [1, 2]])
+    precision, recall, f1 = precision_recall(matrix)
+    assert (precision, recall, f1) == pytest.approx((2 / 3, 2 / 3, 2 / 3))
+    # sin predicciones positivas los denominadores son 0
+    assert precision_recall(confusion_matrix([0, 1], [0, 0])) == (0.0, 0.0, 0.0)
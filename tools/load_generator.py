@@ -0,0 +1,72 @@
+"""
+Generador de carga para el servidor de inferencia
+
+    python tools/load_generator.py imagen.jpg [--concurrency 32] [--requests 1000]
+
+Abre `concurrency` conexiones keep-alive que envían la misma imagen en
+bucle y reporta peticiones por segundo y latencias (p50/p95/p99).
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlparse
+
+async def worker(host, port, body, count, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    head = (
+        f"POST /predict HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/octet-stream\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode("latin-1")
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            writer.write(head + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if not status_line.startswith(b"HTTP/1.1 200"):
+                raise RuntimeError(status_line.decode("latin-1").strip())
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def run(url, body, concurrency, total):
+    parsed = urlparse(url)
+    latencies = []
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(parsed.hostname, parsed.port or 80, body, count, latencies)
+        for count in per_worker if count > 0
+    ))
+    return time.perf_counter() - start, sorted(latencies)
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de inferencia")
+    parser.add_argument("image")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        body = f.read()
+    elapsed, latencies = asyncio.run(run(args.url, body, args.concurrency, args.requests))
+    print(f"{len(latencies)} peticiones en {elapsed:.2f} s -> {len(latencies) / elapsed:.1f} req/s")
+    print(f"latencia p50 {percentile(latencies, 0.50) * 1000:.1f} ms | "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms | "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Cliente de prueba del servidor de inferencia
+
+    python tools/server_client.py imagen.jpg [otra.jpg ...] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import json
+import urllib.request
+
+def predict(url, image_path):
+    with open(image_path, "rb") as f:
+        data = f.read()
+    request = urllib.request.Request(
+        url.rstrip("/") + "/predict", data=data, method="POST",
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente de prueba del servidor de inferencia")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    args = parser.parse_args()
+    for image_path in args.images:
+        try:
+            print(image_path, predict(args.url, image_path))
+        except urllib.error.HTTPError as e:
+            print(image_path, e.code, e.read().decode("utf-8"))
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox, font
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
+import argparse
+import json
 import os
 import sys
+# numpy, PIL y ImageProcessor se importan al usarse para que la ventana
+# aparezca antes
+
+# fuente elegida en una ejecucion anterior (listar las fuentes es lento)
+FONT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai_finalproject", "font.json")
 
 # Configuración para Windows - Arreglar pixelación
 if sys.platform.startswith('win'):
@@ -15,16 +19,24 @@ if sys.platform.startswith('win'):
         pass
 
 # Función para obtener fuentes seguras multiplataforma
-def get_safe_font_family():
-    """Obtiene una fuente que funcione en el sistema actual"""
+def get_safe_font_family(root, cache_path=FONT_CACHE_PATH):
+    """
+    Obtiene una fuente que funcione en el sistema actual
+
+    Args:
+        root: Ventana principal (se usa para consultar las fuentes)
+        cache_path: Archivo donde se guarda la fuente elegida; None para no
+            usar cache
+
+    Returns:
+        Nombre de la familia de la fuente
+    """
     try:
-        # Crear ventana temporal para acceder a las fuentes
-        import tkinter as tk
-        temp_root = tk.Tk()
-        temp_root.withdraw()
+        cached = _read_font_cache(root, cache_path)
+        if cached is not None:
+            return cached
         
-        available_fonts = list(font.families())
-        temp_root.destroy()
+        available_fonts = list(font.families(root))
         
         # Lista de fuentes preferidas en orden de prioridad
         preferred_fonts = [
@@ -33,20 +45,48 @@ def get_safe_font_family():
             "sans-serif", "TkDefaultFont"                   # Fallbacks
         ]
         
-        # Buscar la primera fuente disponible
-        for font_name in preferred_fonts:
-            if font_name in available_fonts:
-                return font_name
-        
-        # Si no encuentra ninguna, usar la primera disponible
-        return available_fonts[0] if available_fonts else "TkDefaultFont"
+        # Buscar la primera fuente disponible; si no encuentra ninguna, usar
+        # la primera disponible
+        font_name = next((name for name in preferred_fonts if name in available_fonts),
+                         available_fonts[0] if available_fonts else "TkDefaultFont")
+        _write_font_cache(root, cache_path, font_name)
+        return font_name
         
     except Exception as e:
         print(f"Error detectando fuentes: {e}")
         return "TkDefaultFont"
 
+def _read_font_cache(root, cache_path):
+    """La fuente guardada, si es de este sistema y sigue instalada"""
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("platform") != sys.platform or cached.get("tk") != root.tk.call("info", "patchlevel"):
+        return None
+    font_name = cached.get("font")
+    # revisar una sola familia es mucho mas barato que listarlas todas
+    if not font_name or font.Font(root=root, family=font_name).actual("family") != font_name:
+        return None
+    return font_name
+
+def _write_font_cache(root, cache_path, font_name):
+    if cache_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"platform": sys.platform, "tk": root.tk.call("info", "patchlevel"), "font": font_name}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
 class FaceRecognitionApp:
-    def __init__(self):
+    def __init__(self, model_path=None):
         # Configuración de CustomTkinter
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -55,16 +95,16 @@ class FaceRecognitionApp:
         ctk.set_widget_scaling(1.0)  # Escalado de widgets
         ctk.set_window_scaling(1.0)  # Escalado de ventana
         
-        # Detectar fuente segura para el sistema
-        self.safe_font = get_safe_font_family()
-        print(f"Usando fuente: {self.safe_font}")
-        
         # Ventana principal
         self.root = ctk.CTk()
         self.root.title("Reconocimiento Facial - Red Neuronal")
         self.root.geometry("800x700")
         self.root.resizable(True, True)
         
+        # Detectar fuente segura para el sistema (con la misma ventana)
+        self.safe_font = get_safe_font_family(self.root)
+        print(f"Usando fuente: {self.safe_font}")
+        
         # Configurar peso de las columnas y filas para el redimensionamiento
         self.root.grid_columnconfigure(0, weight=1)
         self.root.grid_rowconfigure(0, weight=1)
@@ -72,10 +112,27 @@ class FaceRecognitionApp:
         # Variables
         self.current_image = None
         self.image_path = None
+        self.model_path = model_path
+        self._processor = None
         
         # Crear la interfaz
         self.create_widgets()
         
+    @property
+    def processor(self):
+        # Preprocesamiento del modelo: los parametros guardados con el (como
+        # Predictor en main.py y cli.py) o, sin modelo, los de ImageProcessor
+        # por defecto, que son los de cli.py preprocess sin opciones
+        if self._processor is None:
+            from neuralNetwork.utilities.ImageProcessor import ImageProcessor
+            params = None
+            if self.model_path is not None:
+                from neuralNetwork.utilities.ModelFile import read_header
+                # solo el encabezado, sin mapear los pesos
+                params = read_header(self.model_path)[0]["metadata"].get("preprocessing")
+            self._processor = ImageProcessor.from_params(params) if params else ImageProcessor()
+        return self._processor
+
     def create_widgets(self):
         # Crear un frame scrollable que contenga todo el contenido
         self.scrollable_frame = ctk.CTkScrollableFrame(
@@ -221,6 +278,7 @@ class FaceRecognitionApp:
     
     def display_image(self, image_path):
         """Mostrar la imagen en la interfaz"""
+        from PIL import Image
         try:
             # Cargar imagen con PIL
             pil_image = Image.open(image_path)
@@ -230,8 +288,9 @@ class FaceRecognitionApp:
             width, height = pil_image.size
             file_size = os.path.getsize(image_path) / 1024  # KB
             
+            net_width, net_height = self.processor.target_size
             self.info_label.configure(
-                text=f"Dimensiones: {width}x{height} | Tamaño: {file_size:.1f} KB | Red neuronal: 700x600"
+                text=f"Dimensiones: {width}x{height} | Tamaño: {file_size:.1f} KB | Red neuronal: {net_width}x{net_height}"
             )
             
             # Redimensionar para mostrar (manteniendo aspecto) con mejor calidad
@@ -301,24 +360,13 @@ class FaceRecognitionApp:
         Este es solo un ejemplo que simula el comportamiento.
         """
         
-        # Redimensionar imagen a 700x600 para la red neuronal
-        resized_image = self.resize_for_neural_network(self.current_image)
-        
-        # Preprocesar imagen para tu red neuronal
-        # Convertir PIL a numpy array
-        image_array = np.array(resized_image)
-        
-        # Convertir a RGB si es necesario
-        if len(image_array.shape) == 3 and image_array.shape[2] == 4:
-            image_array = cv2.cvtColor(image_array, cv2.COLOR_RGBA2RGB)
-        elif len(image_array.shape) == 3:
-            image_array = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
-        
-        # Normalizar (común en redes neuronales)
-        # processed_image = image_array / 255.0
+        import numpy as np
+        # Redimensionar y normalizar con el mismo preprocesamiento del modelo
+        # (matriz de 1 x processor.feature_size en float32, valores de 0 a 1)
+        processed_image = self.processor.process_batch([self.current_image], dtype=np.float32)
         
         # AQUÍ LLAMAS A TU RED NEURONAL:
-        # prediction = tu_modelo.predict(processed_image)
+        # prediction = tu_modelo.forward(processed_image)
         # confidence = float(prediction[0]) * 100
         # is_recognized = prediction[0] > 0.5  # umbral de decisión
         
@@ -331,111 +379,15 @@ class FaceRecognitionApp:
     
     def resize_for_neural_network(self, pil_image):
         """
-        Redimensiona la imagen a 700x600 píxeles para la red neuronal
+        Redimensiona la imagen con el preprocesamiento del modelo
         
         Args:
             pil_image: Imagen PIL original
             
         Returns:
-            PIL Image redimensionada a 700x600
-        """
-        try:
-            # Crear una copia de la imagen original
-            image_copy = pil_image.copy()
-            
-            # Método 1: Redimensionamiento directo (puede distorsionar)
-            # resized_image = image_copy.resize((700, 600), Image.Resampling.LANCZOS)
-            
-            # Método 2: Redimensionamiento manteniendo aspecto + relleno (recomendado)
-            resized_image = self.resize_with_padding(image_copy, (700, 600))
-            
-            return resized_image
-            
-        except Exception as e:
-            print(f"Error al redimensionar imagen: {e}")
-            return pil_image
-    
-    def resize_with_padding(self, image, target_size):
-        """
-        Redimensiona la imagen manteniendo el aspecto y agregando padding negro
-        
-        Args:
-            image: Imagen PIL
-            target_size: tuple (width, height) - tamaño objetivo
-            
-        Returns:
-            PIL Image redimensionada con padding
-        """
-        target_width, target_height = target_size
-        
-        # Calcular el ratio de redimensionamiento
-        img_width, img_height = image.size
-        ratio = min(target_width / img_width, target_height / img_height)
-        
-        # Calcular nuevas dimensiones
-        new_width = int(img_width * ratio)
-        new_height = int(img_height * ratio)
-        
-        # Redimensionar imagen
-        resized_img = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Crear imagen con fondo negro del tamaño objetivo
-        final_image = Image.new('RGB', target_size, (0, 0, 0))
-        
-        # Calcular posición para centrar la imagen
-        x_offset = (target_width - new_width) // 2
-        y_offset = (target_height - new_height) // 2
-        
-        # Pegar la imagen redimensionada en el centro
-        final_image.paste(resized_img, (x_offset, y_offset))
-        
-        return final_image
-    
-    def resize_direct(self, image, target_size):
-        """
-        Redimensionamiento directo (puede distorsionar la imagen)
-        
-        Args:
-            image: Imagen PIL
-            target_size: tuple (width, height)
-            
-        Returns:
-            PIL Image redimensionada directamente
-        """
-        return image.resize(target_size, Image.Resampling.LANCZOS)
-    
-    def resize_crop_center(self, image, target_size):
-        """
-        Redimensiona y recorta desde el centro
-        
-        Args:
-            image: Imagen PIL
-            target_size: tuple (width, height)
-            
-        Returns:
-            PIL Image redimensionada y recortada
+            PIL Image redimensionada (por defecto 700x600 en blanco y negro)
         """
-        target_width, target_height = target_size
-        img_width, img_height = image.size
-        
-        # Calcular ratio para cubrir completamente el área objetivo
-        ratio = max(target_width / img_width, target_height / img_height)
-        
-        # Redimensionar
-        new_width = int(img_width * ratio)
-        new_height = int(img_height * ratio)
-        resized_img = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Calcular área de recorte desde el centro
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        
-        # Recortar
-        cropped_img = resized_img.crop((left, top, right, bottom))
-        
-        return cropped_img
+        return self.processor.resize_black_and_white(pil_image)
     
     def run(self):
         """Ejecutar la aplicación"""
@@ -443,7 +395,11 @@ class FaceRecognitionApp:
 
 # Función principal
 def main():
-    app = FaceRecognitionApp()
+    parser = argparse.ArgumentParser(description="Prototipo de la interfaz de reconocimiento facial")
+    parser.add_argument("model", nargs="?", default=None,
+                        help="Modelo .nnmodel del que se toma el preprocesamiento")
+    args = parser.parse_args()
+    app = FaceRecognitionApp(args.model)
     app.run()
 
 if __name__ == "__main__":